@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import exists, func, select, update, insert, tuple_, values, column, cast, Integer, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 
 from app.db.session import get_db
-from app.models.event import Event
-from app.schemas.event import EventCreate, EventResponse, EventUpdate
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, set_next_cursor
+from app.core.cache import calendar_cache, if_none_match
+from app.core.ical import CalendarEntry, combine_event_time, render_calendar
+from app.models.event import Event, EventRegistration
+from app.models.job import Job, JobApplication
+from app.models.notification import Notification, NotificationType
+from app.schemas.event import EventCreate, EventResponse, EventUpdate, EventRegistrationRequest, EventRegistrationResponse, CheckInScan, CheckInBatch, CheckInResult
 
 router = APIRouter()
 
@@ -17,10 +25,79 @@ def create_event(event: EventCreate, db: Session = Depends(get_db)):
     return db_event
 
 @router.get("/", response_model=List[EventResponse])
-def get_events(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    events = db.query(Event).offset(skip).limit(limit).all()
+def get_events(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    events, next_cursor = keyset_page(db.query(Event), Event.created_at, Event.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
     return events
 
+def _calendar_entries(db: Session, user_id: int) -> List[CalendarEntry]:
+    entries = []
+    events = (
+        db.query(Event)
+        .join(EventRegistration, EventRegistration.event_id == Event.id)
+        .filter(
+            EventRegistration.user_id == user_id,
+            EventRegistration.registration_status.in_(("registered", "attended")),
+            Event.is_active == True,
+        )
+        .order_by(Event.event_date)
+    )
+    for e in events:
+        entries.append(CalendarEntry(
+            uid=f"event-{e.id}@prepsphere",
+            start=combine_event_time(e.event_date, e.event_time),
+            summary=e.title,
+            description=e.description,
+            location=e.meeting_link if e.is_online and e.meeting_link else e.location,
+            url=e.meeting_link if e.is_online else None,
+        ))
+    interviews = (
+        db.query(JobApplication.id, JobApplication.interview_date, JobApplication.interview_notes, Job.title, Job.company, Job.location)
+        .join(Job, Job.id == JobApplication.job_id)
+        .filter(JobApplication.user_id == user_id, JobApplication.interview_date != None)
+        .order_by(JobApplication.interview_date)
+    )
+    for row in interviews:
+        entries.append(CalendarEntry(
+            uid=f"interview-{row.id}@prepsphere",
+            start=row.interview_date,
+            summary=f"Interview: {row.title} at {row.company}",
+            description=row.interview_notes,
+            location=row.location,
+        ))
+    return entries
+
+@router.get("/calendar/{user_id}.ics")
+def get_user_calendar(user_id: int, request: Request, db: Session = Depends(get_db)):
+    """Subscribable feed of the student's registered events and scheduled interviews.
+
+    Calendar apps poll this every few minutes; the body is cached under the
+    global and per-user calendar versions, so a poll that finds nothing changed
+    is answered with a 304 (or from the cache) without rendering the feed.
+    Both versions are shared by every worker; if either cannot be read the
+    feed is rendered fresh and sent without an ETag.
+    """
+    global_version, user_version = calendar_cache.version(), calendar_cache.version(str(user_id))
+    version = None if global_version is None or user_version is None else f"{global_version}.{user_version}"
+    variant = f"user:{user_id}"
+    headers = {"Cache-Control": "no-cache"}
+    body = None
+    if version is not None:
+        headers["ETag"] = calendar_cache.etag(version, variant)
+        if if_none_match(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        body = calendar_cache.get(version, variant)
+    if body is None:
+        body = render_calendar("PrepSphere", _calendar_entries(db, user_id))
+        if version is not None:
+            calendar_cache.set(version, variant, body)
+    return Response(content=body, media_type="text/calendar; charset=utf-8", headers=headers)
+
 @router.get("/{event_id}", response_model=EventResponse)
 def get_event(event_id: int, db: Session = Depends(get_db)):
     db_event = db.query(Event).filter(Event.id == event_id).first()
@@ -39,6 +116,11 @@ def update_event(event_id: int, event_update: EventUpdate, db: Session = Depends
         setattr(db_event, key, value)
     
     db.commit()
+    if "capacity" in update_data or "is_active" in update_data:
+        # Extra (or reopened) seats go to the waitlist before any newcomer
+        _fill_open_seats(db, event_id)
+        db.commit()
+    calendar_cache.bump()
     db.refresh(db_event)
     return db_event
 
@@ -50,4 +132,271 @@ def delete_event(event_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_event)
     db.commit()
-    return {"message": "Event deleted successfully"}
\ No newline at end of file
+    calendar_cache.bump()
+    return {"message": "Event deleted successfully"}
+
+def _claim_seat(db: Session, event_id: int, from_waitlist: bool = False) -> bool:
+    # The seat check and the increment are one statement, so concurrent
+    # registrations serialize on the event row and can never oversell.
+    conds = [
+        Event.id == event_id,
+        Event.is_active == True,
+        (Event.capacity == None) | (func.coalesce(Event.registered_count, 0) < Event.capacity),
+    ]
+    if not from_waitlist:
+        # Newcomers never take a seat ahead of students already waiting for one
+        conds.append(~exists().where(
+            EventRegistration.event_id == event_id,
+            EventRegistration.registration_status == "waitlisted",
+        ))
+    claimed = db.execute(
+        update(Event)
+        .where(*conds)
+        .values(registered_count=func.coalesce(Event.registered_count, 0) + 1)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return claimed is not None
+
+def _release_seat(db: Session, event_id: int) -> None:
+    db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.registered_count > 0)
+        .values(registered_count=Event.registered_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def _upsert_registration(db: Session, event_id: int, user_id: int, status: str, replace: tuple) -> Optional[EventRegistration]:
+    # Inserts the registration, or moves an existing row whose status is in
+    # `replace` to `status`; any other existing row is left alone and None is returned
+    stmt = pg_insert(EventRegistration).values(event_id=event_id, user_id=user_id, registration_status=status)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EventRegistration.event_id, EventRegistration.user_id],
+        set_={"registration_status": status, "registered_at": func.now(), "attended_at": None},
+        where=EventRegistration.registration_status.in_(replace),
+    ).returning(EventRegistration)
+    return db.execute(stmt, execution_options={"populate_existing": True}).scalar()
+
+def _get_registration(db: Session, event_id: int, user_id: int) -> Optional[EventRegistration]:
+    return (
+        db.query(EventRegistration)
+        .filter(EventRegistration.event_id == event_id, EventRegistration.user_id == user_id)
+        .first()
+    )
+
+def _promote_next(db: Session, event_id: int) -> Optional[int]:
+    """Hand a freed seat to the head of the waitlist, notifying them in the same transaction.
+
+    Returns the promoted student's user id, or None when nobody was waiting.
+
+    SKIP LOCKED lets simultaneous cancellations each claim a different waiting
+    student instead of queueing behind one another.
+    """
+    next_id = (
+        select(EventRegistration.id)
+        .where(EventRegistration.event_id == event_id, EventRegistration.registration_status == "waitlisted")
+        .order_by(EventRegistration.registered_at, EventRegistration.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    promoted = db.execute(
+        update(EventRegistration)
+        .where(EventRegistration.id == next_id, Event.id == EventRegistration.event_id)
+        .values(registration_status="registered", registered_at=func.now())
+        .returning(EventRegistration.user_id, Event.title)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if promoted is None:
+        return None
+    db.execute(insert(Notification).values(
+        user_id=promoted.user_id,
+        title="You're registered",
+        message=f"A seat opened up for {promoted.title} and you have been moved off the waitlist.",
+        notification_type=NotificationType.EVENT_REMINDER,
+        is_read=False,
+        related_id=event_id,
+        related_type="event",
+    ))
+    return promoted.user_id
+
+def _fill_open_seats(db: Session, event_id: int) -> List[int]:
+    """Move waiting students into every free seat; returns the promoted user ids.
+
+    Run after anything that can free a seat or add a waiter (a cancellation,
+    a capacity increase, joining the waitlist), so a seat never stays empty
+    while someone is queued for it.
+    """
+    promoted = []
+    while _claim_seat(db, event_id, from_waitlist=True):
+        user_id = _promote_next(db, event_id)
+        if user_id is None:
+            _release_seat(db, event_id)
+            break
+        promoted.append(user_id)
+    return promoted
+
+@router.post("/{event_id}/register", response_model=EventRegistrationResponse)
+def register_for_event(event_id: int, payload: EventRegistrationRequest, db: Session = Depends(get_db)):
+    try:
+        if not _claim_seat(db, event_id):
+            db.rollback()
+            db_event = db.query(Event).filter(Event.id == event_id).first()
+            if not db_event or not db_event.is_active:
+                raise HTTPException(status_code=404, detail="Event not found")
+            existing = _get_registration(db, event_id, payload.user_id)
+            if existing and existing.registration_status != "cancelled":
+                return EventRegistrationResponse.model_validate(existing)
+            raise HTTPException(status_code=409, detail="Event is full")
+        registration = _upsert_registration(db, event_id, payload.user_id, "registered", ("cancelled", "waitlisted"))
+        if registration is None:
+            # Already registered: give the seat back and return the existing row
+            db.rollback()
+            return EventRegistrationResponse.model_validate(_get_registration(db, event_id, payload.user_id))
+        out = EventRegistrationResponse.model_validate(registration)
+        db.commit()
+        calendar_cache.bump(str(payload.user_id))
+        return out
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+
+@router.post("/{event_id}/waitlist", response_model=EventRegistrationResponse)
+def join_event_waitlist(event_id: int, payload: EventRegistrationRequest, db: Session = Depends(get_db)):
+    # Registers outright while seats remain; otherwise queues the student
+    try:
+        if _claim_seat(db, event_id):
+            registration = _upsert_registration(db, event_id, payload.user_id, "registered", ("cancelled", "waitlisted"))
+            if registration is None:
+                db.rollback()
+                return EventRegistrationResponse.model_validate(_get_registration(db, event_id, payload.user_id))
+        else:
+            db.rollback()
+            db_event = db.query(Event).filter(Event.id == event_id).first()
+            if not db_event or not db_event.is_active:
+                raise HTTPException(status_code=404, detail="Event not found")
+            registration = _upsert_registration(db, event_id, payload.user_id, "waitlisted", ("cancelled",))
+            if registration is None:
+                db.rollback()
+                return EventRegistrationResponse.model_validate(_get_registration(db, event_id, payload.user_id))
+        out = EventRegistrationResponse.model_validate(registration)
+        db.commit()
+        if out.registration_status == "waitlisted":
+            # A seat may have been freed between the failed claim and the
+            # commit, when there was nobody yet to hand it to
+            promoted = _fill_open_seats(db, event_id)
+            db.commit()
+            for user_id in promoted:
+                calendar_cache.bump(str(user_id))
+            if payload.user_id in promoted:
+                out = EventRegistrationResponse.model_validate(_get_registration(db, event_id, payload.user_id))
+        else:
+            calendar_cache.bump(str(payload.user_id))
+        return out
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+
+@router.get("/{event_id}/waitlist/{user_id}")
+def get_waitlist_position(event_id: int, user_id: int, db: Session = Depends(get_db)):
+    mine = _get_registration(db, event_id, user_id)
+    if not mine or mine.registration_status != "waitlisted":
+        raise HTTPException(status_code=404, detail="Not on the waitlist")
+    ahead = (
+        db.query(func.count(EventRegistration.id))
+        .filter(
+            EventRegistration.event_id == event_id,
+            EventRegistration.registration_status == "waitlisted",
+            tuple_(EventRegistration.registered_at, EventRegistration.id) < tuple_(mine.registered_at, mine.id),
+        )
+        .scalar()
+    )
+    return {"event_id": event_id, "user_id": user_id, "position": ahead + 1}
+
+def _cancel(db: Session, event_id: int, user_id: int, from_status: str) -> Optional[EventRegistration]:
+    return db.execute(
+        update(EventRegistration)
+        .where(
+            EventRegistration.event_id == event_id,
+            EventRegistration.user_id == user_id,
+            EventRegistration.registration_status == from_status,
+        )
+        .values(registration_status="cancelled")
+        .returning(EventRegistration)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).scalar()
+
+@router.post("/{event_id}/cancel", response_model=EventRegistrationResponse)
+def cancel_event_registration(event_id: int, payload: EventRegistrationRequest, db: Session = Depends(get_db)):
+    promoted = []
+    registration = _cancel(db, event_id, payload.user_id, "registered")
+    if registration is not None:
+        # Releasing first locks the event row, so a student joining the
+        # waitlist concurrently is either promoted here or finds the free
+        # seat itself once this commits
+        _release_seat(db, event_id)
+        promoted = _fill_open_seats(db, event_id)
+    else:
+        registration = _cancel(db, event_id, payload.user_id, "waitlisted")
+    if registration is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Active registration not found")
+    out = EventRegistrationResponse.model_validate(registration)
+    db.commit()
+    calendar_cache.bump(str(payload.user_id))
+    for user_id in promoted:
+        calendar_cache.bump(str(user_id))
+    return out
+
+def _check_in(db: Session, event_id: int, scans: List[CheckInScan]) -> List[CheckInResult]:
+    # A scanner may report the same student twice; the earliest scan wins
+    first_scan = {}
+    for scan in scans:
+        prev = first_scan.get(scan.user_id)
+        if scan.user_id not in first_scan:
+            first_scan[scan.user_id] = scan.scanned_at
+        elif scan.scanned_at and (prev is None or scan.scanned_at < prev):
+            first_scan[scan.user_id] = scan.scanned_at
+    batch = values(
+        column("user_id", Integer), column("scanned_at", DateTime(timezone=True)), name="scans"
+    ).data(list(first_scan.items()))
+    # One UPDATE for the whole batch; only registered students can be checked in
+    checked_in = dict(db.execute(
+        update(EventRegistration)
+        .where(
+            EventRegistration.event_id == event_id,
+            EventRegistration.user_id == batch.c.user_id,
+            EventRegistration.registration_status == "registered",
+        )
+        .values(registration_status="attended", attended_at=func.coalesce(cast(batch.c.scanned_at, DateTime(timezone=True)), func.now()))
+        .returning(EventRegistration.user_id, EventRegistration.attended_at)
+        .execution_options(synchronize_session=False)
+    ).all())
+    missing = [uid for uid in first_scan if uid not in checked_in]
+    others = {}
+    if missing:
+        others = {
+            row.user_id: row
+            for row in db.query(EventRegistration.user_id, EventRegistration.registration_status, EventRegistration.attended_at)
+            .filter(EventRegistration.event_id == event_id, EventRegistration.user_id.in_(missing))
+        }
+    db.commit()
+    results = []
+    for uid in first_scan:
+        if uid in checked_in:
+            results.append(CheckInResult(user_id=uid, status="checked_in", attended_at=checked_in[uid]))
+        elif uid in others and others[uid].registration_status == "attended":
+            results.append(CheckInResult(user_id=uid, status="already_checked_in", attended_at=others[uid].attended_at))
+        elif uid in others:
+            results.append(CheckInResult(user_id=uid, status=others[uid].registration_status))
+        else:
+            results.append(CheckInResult(user_id=uid, status="not_registered"))
+    return results
+
+@router.post("/{event_id}/check-in", response_model=CheckInResult)
+def check_in(event_id: int, scan: CheckInScan, db: Session = Depends(get_db)):
+    return _check_in(db, event_id, [scan])[0]
+
+@router.post("/{event_id}/check-in/batch", response_model=List[CheckInResult])
+def check_in_batch(event_id: int, payload: CheckInBatch, db: Session = Depends(get_db)):
+    return _check_in(db, event_id, payload.scans)
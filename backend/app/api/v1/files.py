@@ -2,9 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Q
 from typing import Optional
 from typing import Union
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Set
+import asyncio
+import json
 import os
+import time
 import uuid
+from datetime import datetime
 from pathlib import Path
 
 from app.db.session import get_db
@@ -12,44 +16,132 @@ from app.models.resume import Resume
 from app.models.user import User
 from app.models.notification import Notification
 from app.core.config import settings
-import smtplib, ssl
-from email.message import EmailMessage
+from app.core.outbox import enqueue_email
 from app.models.certificate import Certificate
-from app.schemas.file import ResumeResponse, ResumeUpdate, CertificateResponse, CertificateUpdate
+from app.schemas.file import (
+    ResumeResponse, ResumeUpdate, CertificateResponse, CertificateUpdate,
+    UploadTicketRequest, UploadTicket, ResumeUploadConfirm, CertificateUploadConfirm,
+)
 from app.core.config import settings
-import boto3
-from botocore.config import Config
+from app.core.storage import StorageBusyError, get_storage_client, list_keys, run_storage_io, storage_configured
+from app.core.cache import store_get, store_set
 from botocore.exceptions import ClientError
 from urllib.parse import urlparse
 
 router = APIRouter()
 
+# Allowance for the app and database clocks disagreeing when comparing upload times to listing times
+_LISTING_CLOCK_SKEW_SECONDS = 5
+
 def get_s3():
-    if not settings.R2_ENDPOINT or not settings.R2_ACCESS_KEY_ID or not settings.R2_SECRET_ACCESS_KEY or not settings.R2_BUCKET_NAME:
+    s3 = get_storage_client()
+    if s3 is None:
         raise HTTPException(status_code=500, detail="Object storage not configured")
-    return boto3.client(
-        "s3",
-        endpoint_url=settings.R2_ENDPOINT,
-        region_name="auto",
-        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-        config=Config(signature_version="s3v4")
-    )
+    return s3
+
+ALLOWED_UPLOAD_TYPES = ("application/pdf", "image/jpeg", "image/png")
+
+def _new_key(prefix: str, user_id: int, filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1]
+    return f"{prefix}/{user_id}/{uuid.uuid4()}{ext}"
+
+def _public_url(key: str) -> str:
+    if not settings.R2_PUBLIC_BASE_URL:
+        # If no public base URL configured, return S3-style URL
+        return f"{settings.R2_ENDPOINT.rstrip('/')}/{settings.R2_BUCKET_NAME}/{key}"
+    return f"{settings.R2_PUBLIC_BASE_URL.rstrip('/')}/{key}"
 
 def upload_to_r2(prefix: str, upload_file: UploadFile, user_id: int) -> str:
     s3 = get_s3()
-    ext = os.path.splitext(upload_file.filename or "")[1]
-    key = f"{prefix}/{user_id}/{uuid.uuid4()}{ext}"
+    key = _new_key(prefix, user_id, upload_file.filename)
     try:
         upload_file.file.seek(0)
         s3.upload_fileobj(upload_file.file, settings.R2_BUCKET_NAME, key, ExtraArgs={"ContentType": upload_file.content_type or "application/octet-stream"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload to storage: {e}")
-    if not settings.R2_PUBLIC_BASE_URL:
-        # If no public base URL configured, return S3-style URL
-        return f"{settings.R2_ENDPOINT.rstrip('/')}/{settings.R2_BUCKET_NAME}/{key}"
-    return f"{settings.R2_PUBLIC_BASE_URL.rstrip('/')}/{key}"
+    return _public_url(key)
+
+def _upload_ticket(prefix: str, ticket: UploadTicketRequest) -> UploadTicket:
+    if ticket.content_type not in ALLOWED_UPLOAD_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid file type")
+    if not 0 < ticket.size <= settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="File is empty or too large")
+    s3 = get_s3()
+    key = _new_key(prefix, ticket.user_id, ticket.filename)
+    expires_in = settings.R2_UPLOAD_URL_EXPIRE_SECONDS
+    try:
+        # R2 has no POST form uploads, so this is a presigned PUT. The
+        # signature covers Content-Type and Content-Length, so storage rejects
+        # a body of any other type or size sent to this URL.
+        url = s3.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': settings.R2_BUCKET_NAME,
+                'Key': key,
+                'ContentType': ticket.content_type,
+                'ContentLength': ticket.size,
+            },
+            ExpiresIn=expires_in,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate upload URL: {e}")
+    return UploadTicket(url=url, headers={"Content-Type": ticket.content_type}, key=key, max_size=settings.MAX_FILE_SIZE, expires_in=expires_in)
+
+def _confirm_upload(prefix: str, user_id: int, key: str) -> str:
+    """Check that a browser upload landed and still meets the ticket's limits; returns its public URL."""
+    if not key.startswith(f"{prefix}/{user_id}/") or ".." in key:
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    s3 = get_s3()
+    try:
+        head = s3.head_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('NotFound', '404', 'NoSuchKey'):
+            raise HTTPException(status_code=400, detail="Upload not found")
+        raise HTTPException(status_code=502, detail=f"Failed to verify upload: {e}")
+    # The signed URL already pins type and size; checked again here because
+    # the confirm request names the key and must not trust the client
+    if head.get("ContentType") not in ALLOWED_UPLOAD_TYPES or not 0 < head.get("ContentLength", 0) <= settings.MAX_FILE_SIZE:
+        try:
+            s3.delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+        except Exception:
+            pass
+        raise HTTPException(status_code=400, detail="Uploaded file is not an allowed type or size")
+    return _public_url(key)
+
+async def _in_storage_pool(func, *args):
+    try:
+        return await run_storage_io(func, *args)
+    except StorageBusyError:
+        raise HTTPException(status_code=503, detail="Storage is busy, please retry", headers={"Retry-After": "2"})
+
+def _create_resume(db: Session, user_id: int, filename: str, public_url: str) -> Resume:
+    db_resume = Resume(
+        user_id=user_id,
+        filename=filename,
+        file_url=public_url,
+        is_primary=False,
+        is_verified=False
+    )
+    db.add(db_resume)
+    db.commit()
+    db.refresh(db_resume)
+    return db_resume
+
+def _create_certificate(db: Session, user_id: int, title: str, public_url: str) -> Certificate:
+    db_certificate = Certificate(
+        user_id=user_id,
+        title=title,
+        issuer="",
+        file_url=public_url,
+        is_verified=False
+    )
+    db.add(db_certificate)
+    db.commit()
+    db.refresh(db_certificate)
+    return db_certificate
 
+# The upload and the insert both block, so neither runs on the event loop:
+# storage goes through the bounded storage pool, the database through a thread
 @router.post("/resumes", response_model=ResumeResponse)
 async def upload_resume(
     user_id: int = Form(...),
@@ -59,26 +151,12 @@ async def upload_resume(
     # Server enforces type only; size handled by storage limits
     
     # Validate file type
-    allowed_types = ["application/pdf", "image/jpeg", "image/png"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_UPLOAD_TYPES:
         raise HTTPException(status_code=400, detail="Invalid file type")
     
-    # Generate unique filename
     # Upload to Cloudflare R2
-    public_url = upload_to_r2("resume", file, user_id)
-    
-    # Create resume record
-    db_resume = Resume(
-        user_id=user_id,
-        filename=file.filename,
-        file_url=public_url,
-        is_primary=False,
-        is_verified=False
-    )
-    db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
-    return db_resume
+    public_url = await _in_storage_pool(upload_to_r2, "resume", file, user_id)
+    return await asyncio.to_thread(_create_resume, db, user_id, file.filename, public_url)
 
 @router.post("/certificates", response_model=CertificateResponse)
 async def upload_certificate(
@@ -90,26 +168,39 @@ async def upload_certificate(
     # Server enforces type only; size handled by storage limits
     
     # Validate file type
-    allowed_types = ["application/pdf", "image/jpeg", "image/png"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_UPLOAD_TYPES:
         raise HTTPException(status_code=400, detail="Invalid file type")
     
-    # Generate unique filename
     # Upload to Cloudflare R2
-    public_url = upload_to_r2("certificate", file, user_id)
-    
-    # Create certificate record
-    db_certificate = Certificate(
-        user_id=user_id,
-        title=title,
-        issuer="",
-        file_url=public_url,
-        is_verified=False
-    )
-    db.add(db_certificate)
-    db.commit()
-    db.refresh(db_certificate)
-    return db_certificate
+    public_url = await _in_storage_pool(upload_to_r2, "certificate", file, user_id)
+    return await asyncio.to_thread(_create_certificate, db, user_id, title, public_url)
+
+# Two-phase uploads: the browser PUTs the file straight to object storage
+# with a presigned URL, then confirms so the row is created
+@router.post("/resumes/upload-url", response_model=UploadTicket)
+def resume_upload_url(ticket: UploadTicketRequest):
+    return _upload_ticket("resume", ticket)
+
+@router.post("/resumes/confirm", response_model=ResumeResponse)
+def confirm_resume_upload(confirm: ResumeUploadConfirm, db: Session = Depends(get_db)):
+    public_url = _confirm_upload("resume", confirm.user_id, confirm.key)
+    # Confirming twice (e.g. a retried request) returns the row created the first time
+    db_resume = db.query(Resume).filter(Resume.user_id == confirm.user_id, Resume.file_url == public_url).first()
+    if db_resume:
+        return db_resume
+    return _create_resume(db, confirm.user_id, confirm.filename, public_url)
+
+@router.post("/certificates/upload-url", response_model=UploadTicket)
+def certificate_upload_url(ticket: UploadTicketRequest):
+    return _upload_ticket("certificate", ticket)
+
+@router.post("/certificates/confirm", response_model=CertificateResponse)
+def confirm_certificate_upload(confirm: CertificateUploadConfirm, db: Session = Depends(get_db)):
+    public_url = _confirm_upload("certificate", confirm.user_id, confirm.key)
+    db_certificate = db.query(Certificate).filter(Certificate.user_id == confirm.user_id, Certificate.file_url == public_url).first()
+    if db_certificate:
+        return db_certificate
+    return _create_certificate(db, confirm.user_id, confirm.title, public_url)
 
 @router.get("/resumes/{resume_id}", response_model=ResumeResponse)
 def get_resume(resume_id: int, db: Session = Depends(get_db)):
@@ -253,25 +344,56 @@ def get_presigned(file_id: int, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate presigned URL: {e}")
 
+def _stored_keys(prefix: str, user_id: int, newest: Optional[datetime]) -> Optional[Set[str]]:
+    """Object keys under `{prefix}/{user_id}/`, from a short-lived cache in front of ListObjectsV2.
+
+    A cached listing taken before the newest row was created is refreshed, so
+    a file just uploaded through another worker never looks missing. Returns
+    None when the listing fails.
+    """
+    cache_key = f"storage:keys:{prefix}/{user_id}"
+    cached = store_get(cache_key)
+    if cached is not None:
+        entry = json.loads(cached)
+        if newest is None or newest.timestamp() < entry["at"] - _LISTING_CLOCK_SKEW_SECONDS:
+            return set(entry["keys"])
+    try:
+        listed_at = time.time()
+        keys = list_keys(get_s3(), f"{prefix}/{user_id}/")
+    except Exception as e:
+        print(f"Listing {prefix} files for user {user_id} failed: {e}")
+        return None
+    store_set(cache_key, json.dumps({"at": listed_at, "keys": sorted(keys)}), settings.R2_LISTING_CACHE_SECONDS)
+    return keys
+
+def _present_in_r2(prefix: str, user_id: int, rows: list) -> list:
+    rows = [r for r in rows if r.file_url]
+    # If storage is not configured, assume files exist (do not hide DB rows)
+    if not rows or not storage_configured():
+        return rows
+    keys = _stored_keys(prefix, user_id, max((r.uploaded_at for r in rows if r.uploaded_at), default=None))
+    if keys is None:
+        # Storage availability may be transient; show everything rather than nothing
+        return rows
+    owned = f"{prefix}/{user_id}/"
+    out = []
+    for r in rows:
+        key = _key_from_url(r.file_url)
+        # Objects stored outside the user's prefix are not covered by the listing
+        if key in keys or (not key.startswith(owned) and _exists_in_r2(r.file_url)):
+            out.append(r)
+    return out
+
 @router.get("/by-user/{user_id}")
 def list_files_by_user(user_id: int, db: Session = Depends(get_db)):
     resumes = db.query(Resume).filter(Resume.user_id == user_id).all()
     certs = db.query(Certificate).filter(Certificate.user_id == user_id).all()
     out: List[dict] = []
-    for r in resumes:
-        if not r.file_url:
-            continue
-        exists = _exists_in_r2(r.file_url)
-        if exists:
-            out.append({"id": r.id, "file_type": "resume", "filename": r.filename, "file_url": r.file_url, "uploaded_at": getattr(r, 'uploaded_at', None)})
-        # Do not delete DB records during listing; storage availability may be transient
-    for c in certs:
-        if not c.file_url:
-            continue
-        exists = _exists_in_r2(c.file_url)
-        if exists:
-            out.append({"id": c.id, "file_type": "certificate", "title": c.title, "file_url": c.file_url, "uploaded_at": getattr(c, 'uploaded_at', None)})
-        # Do not delete DB records during listing; storage availability may be transient
+    # Do not delete DB records during listing; storage availability may be transient
+    for r in _present_in_r2("resume", user_id, resumes):
+        out.append({"id": r.id, "file_type": "resume", "filename": r.filename, "file_url": r.file_url, "uploaded_at": getattr(r, 'uploaded_at', None)})
+    for c in _present_in_r2("certificate", user_id, certs):
+        out.append({"id": c.id, "file_type": "certificate", "title": c.title, "file_url": c.file_url, "uploaded_at": getattr(c, 'uploaded_at', None)})
     db.commit()
     out.sort(key=lambda x: x.get('uploaded_at', 0), reverse=True)
     return out
@@ -334,58 +456,37 @@ def verify_resume(resume_id: int, db: Session = Depends(get_db)):
     db.refresh(r)
     return {"id": r.id, "is_verified": True}
 
-@router.put("/resumes/{resume_id}/reject")
-def _send_email(to_email: str, subject: str, body: str) -> bool:
-    host = settings.SMTP_HOST
-    user = settings.SMTP_USER
-    pwd = settings.SMTP_PASS
-    from_addr = settings.SMTP_FROM or user
-    port = int(getattr(settings, 'SMTP_PORT', 587))
-    try:
-        msg = EmailMessage()
-        msg['From'] = from_addr
-        msg['To'] = to_email
-        msg['Subject'] = subject or 'Resume Rejected'
-        msg.set_content(body or '')
-        if port == 465:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(host, port, context=context) as server:
-                server.login(user, pwd)
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(host, port) as server:
-                server.ehlo(); server.starttls(); server.login(user, pwd); server.send_message(msg)
-        return True
-    except Exception as e:
-        print(f"Email send failed (files.reject): {e}")
-        return False
-
-async def reject_resume(resume_id: int, request: Request, reason_q: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def _reject_resume(db: Session, resume_id: int, reason: Optional[str]) -> dict:
     r = db.query(Resume).filter(Resume.id == resume_id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Resume not found")
     r.is_verified = False
     db.commit()
     db.refresh(r)
-    email_sent = False
+    email_queued = False
     try:
         user = db.query(User).filter(User.id == r.user_id).first()
-        msg = None
-        try:
-            payload = await request.json()
-            if isinstance(payload, dict):
-                msg = payload.get('reason')
-        except Exception:
-            pass
-        if not msg:
-            msg = reason_q
-        note = Notification(user_id=r.user_id, title='Resume Rejected', message=(msg or 'Your resume was rejected'))
-        db.add(note); db.commit(); db.refresh(note)
+        note = Notification(user_id=r.user_id, title='Resume Rejected', message=(reason or 'Your resume was rejected'))
+        db.add(note)
         if user:
-            email_sent = _send_email(user.email, 'Resume Rejected', note.message)
+            email_queued = enqueue_email(db, user.email, 'Resume Rejected', note.message, user_id=user.id)
+        db.commit()
     except Exception as e:
+        db.rollback()
         print(f"Reject resume notify failed: {e}")
-    return {"id": r.id, "is_verified": False, "email_sent": email_sent}
+    return {"id": r.id, "is_verified": False, "email_queued": email_queued}
+
+@router.put("/resumes/{resume_id}/reject")
+async def reject_resume(resume_id: int, request: Request, reason_q: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    msg = None
+    try:
+        payload = await request.json()
+        if isinstance(payload, dict):
+            msg = payload.get('reason')
+    except Exception:
+        pass
+    return await asyncio.to_thread(_reject_resume, db, resume_id, msg or reason_q)
+
 @router.post("/resumes/reject")
 async def reject_resume_post(request: Request, db: Session = Depends(get_db)):
     try:
@@ -401,18 +502,4 @@ async def reject_resume_post(request: Request, db: Session = Depends(get_db)):
         resume_id = int(resume_id)
     except Exception:
         raise HTTPException(status_code=422, detail="resume_id missing or invalid")
-    r = db.query(Resume).filter(Resume.id == resume_id).first()
-    if not r:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    r.is_verified = False
-    db.commit(); db.refresh(r)
-    email_sent = False
-    try:
-        user = db.query(User).filter(User.id == r.user_id).first()
-        note = Notification(user_id=r.user_id, title='Resume Rejected', message=(reason or 'Your resume was rejected'))
-        db.add(note); db.commit(); db.refresh(note)
-        if user:
-            email_sent = _send_email(user.email, 'Resume Rejected', note.message)
-    except Exception as e:
-        print(f"Reject resume notify failed (post): {e}")
-    return {"id": r.id, "is_verified": False, "email_sent": email_sent}
+    return await asyncio.to_thread(_reject_resume, db, resume_id, reason)
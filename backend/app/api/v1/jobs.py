@@ -1,45 +1,318 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from sqlalchemy import func
+from typing import List, Optional
+from datetime import datetime
+import csv
+import hashlib
+import io
+import json
+from sqlalchemy import and_, func, select, update, insert, literal_column, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by
+from sqlalchemy.exc import IntegrityError
 
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, set_next_cursor, decode_cursor, encode_cursor
+from app.core import idempotency
+from app.core.cache import job_feed_cache, calendar_cache, if_none_match
 from app.models.job import Job, JobApplication
-from app.schemas.job import JobCreate, JobResponse, JobUpdate, JobApplicationCreate, JobApplicationResponse, JobApplicationUpdate
+from app.models.resume import Resume
+from app.models.notification import Notification, NotificationType
+from app.models.user import User, Profile, UserRole
+from app.core.matching import SkillIndex, index_cache
+from app.schemas.job import JobCreate, JobResponse, JobUpdate, JobApplicationCreate, JobApplicationResponse, JobApplicationUpdate, JobSearchResult, JobMatchResult, JobApplicationBulkStatusUpdate, JobBrowseResponse
 
 router = APIRouter()
 
+def _applicant_count():
+    # Correlated COUNT evaluated inside the job listing query, so a page of jobs
+    # costs a single round trip regardless of how many rows it holds.
+    return (
+        select(func.count(JobApplication.id))
+        .where(JobApplication.job_id == Job.id)
+        .correlate(Job)
+        .scalar_subquery()
+        .label("applicants")
+    )
+
+def _approved_students(db: Session):
+    return (
+        db.query(User, Profile)
+        .join(Profile, Profile.user_id == User.id)
+        .filter(User.role == UserRole.STUDENT)
+        .filter(User.is_approved == True)
+        .filter(Profile.is_approved == True)
+    )
+
+def _student_skill_index(db: Session) -> SkillIndex:
+    # Any profile edit or approval change bumps updated_at, which rebuilds the index
+    fingerprint = tuple(
+        _approved_students(db)
+        .with_entities(
+            func.count(Profile.id),
+            func.max(func.coalesce(Profile.updated_at, Profile.created_at)),
+            func.max(func.coalesce(User.updated_at, User.created_at)),
+        )
+        .one()
+    )
+    def build():
+        rows = _approved_students(db).with_entities(User.id, Profile.skills).all()
+        return SkillIndex([(uid, skills) for uid, skills in rows])
+    return index_cache.get("students", fingerprint, build)
+
+def _job_text(title: str, requirements: str) -> str:
+    return f"{title or ''} {requirements or ''}"
+
+def _job_skill_index(db: Session) -> SkillIndex:
+    active = db.query(Job).filter(Job.is_active == True)
+    fingerprint = tuple(
+        active.with_entities(
+            func.count(Job.id),
+            func.max(Job.id),
+            func.max(func.coalesce(Job.updated_at, Job.created_at)),
+        ).one()
+    )
+    def build():
+        rows = active.with_entities(Job.id, Job.title, Job.requirements).all()
+        return SkillIndex([(jid, _job_text(t, r)) for jid, t, r in rows])
+    return index_cache.get("jobs", fingerprint, build)
+
+FACET_FIELDS = ("location", "job_type", "company")
+FACET_VALUES_LIMIT = 50
+
+class JobFilters:
+    """Feed filters shared by the job list and browse endpoints."""
+
+    def __init__(
+        self,
+        location: Optional[List[str]] = Query(None),
+        job_type: Optional[List[str]] = Query(None),
+        company: Optional[List[str]] = Query(None),
+        deadline_after: Optional[datetime] = None,
+        deadline_before: Optional[datetime] = None,
+    ):
+        self.location = location
+        self.job_type = job_type
+        self.company = company
+        self.deadline_after = deadline_after
+        self.deadline_before = deadline_before
+
+    def clauses(self, skip: tuple = ()) -> list:
+        """WHERE clauses for the active filters, leaving out the fields named in `skip`."""
+        out = []
+        if self.location and "location" not in skip:
+            out.append(Job.location.in_(self.location))
+        if self.job_type and "job_type" not in skip:
+            out.append(Job.job_type.in_(self.job_type))
+        if self.company and "company" not in skip:
+            out.append(Job.company.in_(self.company))
+        if self.deadline_after and "deadline_after" not in skip:
+            out.append(Job.application_deadline >= self.deadline_after)
+        if self.deadline_before and "deadline_before" not in skip:
+            out.append(Job.application_deadline <= self.deadline_before)
+        return out
+
+    def cache_key(self) -> str:
+        return json.dumps([
+            sorted(self.location or []), sorted(self.job_type or []), sorted(self.company or []),
+            self.deadline_after.isoformat() if self.deadline_after else None,
+            self.deadline_before.isoformat() if self.deadline_before else None,
+        ])
+
+def _job_response(j: Job, cnt: int) -> JobResponse:
+    return JobResponse(
+        id=j.id,
+        title=j.title,
+        company=j.company,
+        location=j.location,
+        description=j.description,
+        requirements=j.requirements,
+        salary_range=j.salary_range,
+        job_type=j.job_type,
+        job_url=getattr(j, 'job_url', None),
+        application_deadline=j.application_deadline,
+        is_active=j.is_active,
+        created_by=j.created_by,
+        created_at=j.created_at,
+        updated_at=j.updated_at,
+        applicants=cnt or 0
+    )
+
 @router.post("/", response_model=JobResponse)
 def create_job(job: JobCreate, db: Session = Depends(get_db)):
     db_job = Job(**job.dict())
     db.add(db_job)
     db.commit()
+    job_feed_cache.bump()
     db.refresh(db_job)
     return db_job
 
 @router.get("/", response_model=List[JobResponse])
-def get_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    rows = db.query(Job).filter(Job.is_active == True).order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
-    out: List[JobResponse] = []
-    for j in rows:
-        cnt = db.query(func.count(JobApplication.id)).filter(JobApplication.job_id == j.id).scalar() or 0
-        jd = JobResponse(
-            id=j.id,
-            title=j.title,
-            company=j.company,
-            location=j.location,
-            description=j.description,
-            requirements=j.requirements,
-            salary_range=j.salary_range,
-            job_url=getattr(j, 'job_url', None),
-            application_deadline=j.application_deadline,
-            is_active=j.is_active,
-            created_by=j.created_by,
-            created_at=j.created_at,
-            updated_at=j.updated_at,
-            applicants=cnt
+def get_jobs(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: JobFilters = Depends(),
+    db: Session = Depends(get_db)
+):
+    # Public student feed: served from the versioned cache, and answered with a
+    # 304 straight from the version number when the client's copy is current.
+    # Without a readable shared version the feed is rebuilt and sent without an ETag.
+    version = job_feed_cache.version()
+    variant = f"{cursor or ''}:{limit}:{filters.cache_key()}"
+    headers = {"Cache-Control": "no-cache"}
+    cached = None
+    if version is not None:
+        headers["ETag"] = job_feed_cache.etag(version, variant)
+        if if_none_match(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        cached = job_feed_cache.get(version, variant)
+    if cached is None:
+        q = db.query(Job, _applicant_count()).filter(Job.is_active == True, *filters.clauses())
+        rows, next_cursor = keyset_page(q, Job.created_at, Job.id, cursor, limit)
+        body = json.dumps(jsonable_encoder([_job_response(j, cnt) for j, cnt in rows])).encode("utf-8")
+        # Cached as "<next cursor>\n<json body>"; cursors are base64 so never contain a newline
+        cached = (next_cursor or "").encode("ascii") + b"\n" + body
+        if version is not None:
+            job_feed_cache.set(version, variant, cached)
+    next_cursor, body = cached.split(b"\n", 1)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor.decode("ascii")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/browse", response_model=JobBrowseResponse)
+def browse_jobs(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: JobFilters = Depends(),
+    db: Session = Depends(get_db)
+):
+    version = job_feed_cache.version()
+    variant = f"browse:{cursor or ''}:{limit}:{filters.cache_key()}"
+    headers = {"Cache-Control": "no-cache"}
+    body = None
+    if version is not None:
+        headers["ETag"] = job_feed_cache.etag(version, variant)
+        if if_none_match(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        body = job_feed_cache.get(version, variant)
+    if body is None:
+        body = json.dumps(jsonable_encoder(_browse(db, filters, cursor, limit))).encode("utf-8")
+        if version is not None:
+            job_feed_cache.set(version, variant, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _browse(db: Session, filters: JobFilters, cursor: Optional[str], limit: int) -> JobBrowseResponse:
+    page_conds = [Job.is_active == True, *filters.clauses()]
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        page_conds.append(tuple_(Job.created_at, Job.id) < tuple_(ts, row_id))
+    page = (
+        select(
+            Job.id, Job.title, Job.company, Job.location, Job.description, Job.requirements,
+            Job.salary_range, Job.job_type, Job.job_url, Job.application_deadline, Job.is_active,
+            Job.created_by, Job.created_at, Job.updated_at, _applicant_count(),
         )
-        out.append(jd)
+        .where(*page_conds)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(limit + 1)
+        .subquery("page")
+    )
+    # One GROUPING SETS pass yields every facet's counts; GROUPING(col) = 0
+    # marks the rows that belong to that column's set. Each facet is counted
+    # with every filter except its own (c_<field>), so picking one location
+    # still shows how many jobs the other locations would add.
+    facet_cols = [getattr(Job, f) for f in FACET_FIELDS]
+    facet_counts = []
+    for f in FACET_FIELDS:
+        others = filters.clauses(skip=(f,))
+        count = func.count().filter(and_(*others)) if others else func.count()
+        facet_counts.append(count.label(f"c_{f}"))
+    facets = (
+        select(
+            *facet_cols,
+            *[func.grouping(c).label(f"g_{c.key}") for c in facet_cols],
+            *facet_counts,
+        )
+        .where(Job.is_active == True, *filters.clauses(skip=FACET_FIELDS))
+        .group_by(func.grouping_sets(*facet_cols))
+        .subquery("facets")
+    )
+    empty = text("'[]'::json")
+    # Page and facets come back as two JSON aggregates in a single round trip
+    items_json, facets_json = db.execute(select(
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(page.table_valued(), page.c.created_at.desc(), page.c.id.desc())),
+            empty,
+        )).scalar_subquery(),
+        select(func.coalesce(func.json_agg(facets.table_valued()), empty)).scalar_subquery(),
+    )).one()
+
+    next_cursor = None
+    if len(items_json) > limit:
+        items_json = items_json[:limit]
+        last = JobResponse(**items_json[-1])
+        next_cursor = encode_cursor(last.created_at, last.id)
+    grouped = {f: [] for f in FACET_FIELDS}
+    for row in facets_json:
+        for f in FACET_FIELDS:
+            if row[f"g_{f}"] == 0 and row[f"c_{f}"]:
+                grouped[f].append({"value": row[f], "count": row[f"c_{f}"]})
+    for f in FACET_FIELDS:
+        grouped[f] = sorted(grouped[f], key=lambda x: -x["count"])[:FACET_VALUES_LIMIT]
+    return JobBrowseResponse(items=[JobResponse(**it) for it in items_json], facets=grouped, next_cursor=next_cursor)
+
+@router.get("/search", response_model=List[JobSearchResult])
+def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200),
+    include_closed: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    ts_query = func.websearch_to_tsquery('english', q)
+    rank = func.ts_rank_cd(Job.search_vector, ts_query).label("rank")
+    # Rank via the GIN index first; ts_headline re-parses the document, so only
+    # run it over the rows that made the page.
+    top = db.query(Job.id.label("id"), rank).filter(Job.search_vector.op('@@')(ts_query))
+    if not include_closed:
+        top = top.filter(Job.is_active == True)
+    top = top.order_by(rank.desc(), Job.id.desc()).limit(limit).subquery()
+    headline = func.ts_headline(
+        'english',
+        Job.description,
+        ts_query,
+        'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2',
+    )
+    rows = (
+        db.query(Job, top.c.rank, headline, _applicant_count())
+        .join(top, top.c.id == Job.id)
+        .order_by(top.c.rank.desc(), Job.id.desc())
+        .all()
+    )
+    out: List[JobSearchResult] = []
+    for j, r, h, cnt in rows:
+        base = _job_response(j, cnt)
+        out.append(JobSearchResult(**base.model_dump(), rank=float(r or 0), headline=h or ''))
+    return out
+
+@router.get("/recommended/{user_id}", response_model=List[JobMatchResult])
+def recommended_jobs(user_id: int, limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    db_profile = db.query(Profile).filter(Profile.user_id == user_id).first()
+    if not db_profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    matches = _job_skill_index(db).top(db_profile.skills, limit)
+    if not matches:
+        return []
+    rows = db.query(Job, _applicant_count()).filter(Job.id.in_([m[0] for m in matches])).all()
+    by_id = {j.id: (j, cnt) for j, cnt in rows}
+    out: List[JobMatchResult] = []
+    for job_id, score, matched in matches:
+        if job_id not in by_id:
+            continue
+        base = _job_response(*by_id[job_id])
+        out.append(JobMatchResult(**base.model_dump(), score=round(score, 4), matched_skills=matched))
     return out
 
 @router.get("/{job_id}", response_model=JobResponse)
@@ -75,6 +348,8 @@ def update_job(job_id: int, job_update: JobUpdate, db: Session = Depends(get_db)
         setattr(db_job, key, value)
     
     db.commit()
+    job_feed_cache.bump()
+    calendar_cache.bump()
     db.refresh(db_job)
     return db_job
 
@@ -86,63 +361,96 @@ def delete_job(job_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_job)
     db.commit()
+    job_feed_cache.bump()
+    calendar_cache.bump()
     return {"message": "Job deleted successfully"}
 
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+
 @router.post("/applications", response_model=JobApplicationResponse)
-def create_application(application: JobApplicationCreate, db: Session = Depends(get_db)):
-    # Check if job exists
-    db_job = db.query(Job).filter(Job.id == application.job_id).first()
-    if not db_job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Check if user exists
-    # (In a real app, you would also verify the user exists)
-    
-    # Create application
-    db_application = JobApplication(**application.dict())
-    db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
-    return db_application
+def create_application(
+    application: JobApplicationCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db)
+):
+    data = application.dict()
+    fingerprint = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+    # Records live in their own table, so replays and mismatch detection hold
+    # for the full TTL regardless of cache configuration or traffic
+    store_key = f"applications:{idempotency_key}" if idempotency_key else None
+    if store_key:
+        stored = idempotency.lookup(db, store_key)
+        if stored is not None:
+            stored_fingerprint, stored_response = stored
+            if stored_fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+            return stored_response
+
+    # One statement whether or not the student already applied: a conflicting
+    # (job_id, user_id) row is returned as-is instead of creating a duplicate.
+    # The no-op DO UPDATE is what makes RETURNING yield the existing row.
+    stmt = pg_insert(JobApplication).values(**data)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobApplication.job_id, JobApplication.user_id],
+        set_={"job_id": stmt.excluded.job_id},
+    ).returning(JobApplication, literal_column("xmax = 0").label("inserted"))
+    try:
+        db_application, inserted = db.execute(stmt, execution_options={"populate_existing": True}).one()
+        response = jsonable_encoder(JobApplicationResponse.model_validate(db_application))
+        if store_key:
+            idempotency.remember(db, store_key, fingerprint, response, IDEMPOTENCY_TTL_SECONDS)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if 'table "jobs"' in str(e.orig):
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=404, detail="User or resume not found")
+    if inserted:
+        # Applicant counts are part of the feed
+        job_feed_cache.bump()
+    return response
 
 @router.get("/applications/", response_model=List[JobApplicationResponse])
-def get_applications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    applications = db.query(JobApplication).offset(skip).limit(limit).all()
+def get_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    applications, next_cursor = keyset_page(db.query(JobApplication), JobApplication.applied_at, JobApplication.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
     return applications
 
 @router.get("/{job_id}/applications", response_model=List[JobApplicationResponse])
-def get_applications_by_job(job_id: int, db: Session = Depends(get_db)):
-    applications = db.query(JobApplication).filter(JobApplication.job_id == job_id).all()
+def get_applications_by_job(
+    job_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    q = db.query(JobApplication).filter(JobApplication.job_id == job_id)
+    applications, next_cursor = keyset_page(q, JobApplication.applied_at, JobApplication.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
     return applications
 
 # TPO convenience routes
 @router.get("/tpo/jobs", response_model=List[JobResponse])
-def tpo_list_jobs(db: Session = Depends(get_db)):
-    # TPO DASHBOARD VIEW: Return ALL jobs (Active and Closed).
-    # This allows TPOs to view historical data and manage closed jobs.
-    # The frontend is responsible for separating them into Active/Closed tabs.
-    rows = db.query(Job).order_by(Job.created_at.desc()).all()
-    out: List[JobResponse] = []
-    for j in rows:
-        cnt = db.query(func.count(JobApplication.id)).filter(JobApplication.job_id == j.id).scalar() or 0
-        jd = JobResponse(
-            id=j.id,
-            title=j.title,
-            company=j.company,
-            location=j.location,
-            description=j.description,
-            requirements=j.requirements,
-            salary_range=j.salary_range,
-            job_url=getattr(j, 'job_url', None),
-            application_deadline=j.application_deadline,
-            is_active=j.is_active,
-            created_by=j.created_by,
-            created_at=j.created_at,
-            updated_at=j.updated_at,
-            applicants=cnt
-        )
-        out.append(jd)
-    return out
+def tpo_list_jobs(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    # TPO DASHBOARD VIEW: Lists jobs of every status (Active and Closed), newest first,
+    # so TPOs can view historical data and manage closed jobs.
+    # Paginated: each call returns at most `limit` jobs (100 by default, 500 max).
+    # While more remain, the X-Next-Cursor response header carries a cursor to pass
+    # back as `?cursor=`; keep following it until the header is absent to load
+    # every job. The frontend separates them into Active/Closed tabs.
+    rows, next_cursor = keyset_page(db.query(Job, _applicant_count()), Job.created_at, Job.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return [_job_response(j, cnt) for j, cnt in rows]
 
 @router.post("/tpo/jobs", response_model=JobResponse)
 def tpo_create_job(job: JobCreate, db: Session = Depends(get_db)):
@@ -153,8 +461,151 @@ def tpo_update_job(job_id: int, job_update: JobUpdate, db: Session = Depends(get
     return update_job(job_id, job_update, db)
 
 @router.get("/tpo/jobs/{job_id}/applications", response_model=List[JobApplicationResponse])
-def tpo_get_job_apps(job_id: int, db: Session = Depends(get_db)):
-    return get_applications_by_job(job_id, db)
+def tpo_get_job_apps(
+    job_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    return get_applications_by_job(job_id, response, cursor, limit, db)
+
+@router.get("/tpo/jobs/{job_id}/candidates")
+def tpo_top_candidates(job_id: int, limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    db_job = db.query(Job).filter(Job.id == job_id).first()
+    if not db_job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    matches = _student_skill_index(db).top(_job_text(db_job.title, db_job.requirements), limit)
+    if not matches:
+        return []
+    rows_raw = _approved_students(db).filter(User.id.in_([m[0] for m in matches])).all()
+    by_id = {u.id: (u, p) for u, p in rows_raw}
+    rows = []
+    for user_id, score, matched in matches:
+        if user_id not in by_id:
+            continue
+        u, p = by_id[user_id]
+        rows.append({
+            "user_id": u.id,
+            "first_name": u.first_name,
+            "last_name": u.last_name,
+            "email": u.email,
+            "degree": p.degree,
+            "year": p.year,
+            "skills": p.skills,
+            "score": round(score, 4),
+            "matched_skills": matched,
+        })
+    return rows
+
+EXPORT_COLUMNS = [
+    "application_id", "status", "applied_at", "user_id", "first_name", "last_name",
+    "email", "degree", "year", "resume_url",
+]
+EXPORT_BATCH_SIZE = 1000
+
+def _export_rows(job_id: int):
+    # Own session: the stream outlives the request's dependency scope. yield_per
+    # makes psycopg2 use a server-side cursor so memory stays flat for any size.
+    db = SessionLocal()
+    try:
+        q = (
+            db.query(
+                JobApplication.id, JobApplication.status, JobApplication.applied_at, User.id,
+                User.first_name, User.last_name, User.email, Profile.degree, Profile.year, Resume.file_url,
+            )
+            .join(User, User.id == JobApplication.user_id)
+            .outerjoin(Profile, Profile.user_id == User.id)
+            .outerjoin(Resume, Resume.id == JobApplication.resume_id)
+            .filter(JobApplication.job_id == job_id)
+            .order_by(JobApplication.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for row in q:
+            status = row[1].value if row[1] is not None else None
+            applied_at = row[2].isoformat() if row[2] else None
+            yield [row[0], status, applied_at, *row[3:]]
+    finally:
+        db.close()
+
+def _export_csv(job_id: int):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    for i, row in enumerate(_export_rows(job_id), 1):
+        writer.writerow(row)
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+    yield buf.getvalue()
+
+def _export_ndjson(job_id: int):
+    chunk: List[str] = []
+    for row in _export_rows(job_id):
+        chunk.append(json.dumps(dict(zip(EXPORT_COLUMNS, row))))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+@router.get("/tpo/jobs/{job_id}/applications/export")
+def tpo_export_job_apps(job_id: int, format: str = Query("csv", pattern="^(csv|ndjson)$"), db: Session = Depends(get_db)):
+    if not db.query(Job.id).filter(Job.id == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    if format == "ndjson":
+        body, media_type, ext = _export_ndjson(job_id), "application/x-ndjson", "ndjson"
+    else:
+        body, media_type, ext = _export_csv(job_id), "text/csv", "csv"
+    headers = {"Content-Disposition": f'attachment; filename="job_{job_id}_applications.{ext}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+@router.put("/tpo/applications/status")
+def tpo_bulk_update_application_status(payload: JobApplicationBulkStatusUpdate, db: Session = Depends(get_db)):
+    if not payload.application_ids and payload.job_id is None:
+        raise HTTPException(status_code=422, detail="Provide application_ids or job_id")
+    stmt = (
+        update(JobApplication)
+        .where(JobApplication.status != payload.status)
+        .values(status=payload.status, updated_at=func.now())
+        .returning(JobApplication.id, JobApplication.user_id, JobApplication.job_id)
+        .execution_options(synchronize_session=False)
+    )
+    if payload.application_ids:
+        stmt = stmt.where(JobApplication.id.in_(payload.application_ids))
+    if payload.job_id is not None:
+        stmt = stmt.where(JobApplication.job_id == payload.job_id)
+    if payload.from_status is not None:
+        stmt = stmt.where(JobApplication.status == payload.from_status)
+    try:
+        changed = db.execute(stmt).all()
+        if changed and payload.notify:
+            titles = dict(
+                db.query(Job.id, Job.title).filter(Job.id.in_({row.job_id for row in changed})).all()
+            )
+            label = payload.status.value.replace('_', ' ')
+            db.execute(insert(Notification), [
+                {
+                    "user_id": row.user_id,
+                    "title": "Application Update",
+                    "message": f"Your application for {titles.get(row.job_id, 'a job')} is now {label}.",
+                    "notification_type": NotificationType.APPLICATION_UPDATE,
+                    "is_read": False,
+                    "related_id": row.id,
+                    "related_type": "application",
+                }
+                for row in changed
+            ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update applications: {e}")
+    return {
+        "updated": len(changed),
+        "status": payload.status.value,
+        "application_ids": [row.id for row in changed],
+    }
 
 @router.put("/applications/{application_id}", response_model=JobApplicationResponse)
 def update_application(application_id: int, application_update: JobApplicationUpdate, db: Session = Depends(get_db)):
@@ -167,5 +618,7 @@ def update_application(application_id: int, application_update: JobApplicationUp
         setattr(db_application, key, value)
     
     db.commit()
+    if update_data.keys() & {"interview_scheduled", "interview_date", "interview_notes"}:
+        calendar_cache.bump(str(db_application.user_id))
     db.refresh(db_application)
     return db_application
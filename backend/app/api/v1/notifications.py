@@ -1,18 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-import os
-import smtplib
-import ssl
-from email.message import EmailMessage
-import json
-import urllib.request
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+import asyncio
 
 from app.db.session import get_db
-from app.models.notification import Notification
-from app.models.user import User
-from app.schemas.notification import NotificationCreate, NotificationResponse, NotificationUpdate
+from app.core.outbox import enqueue_email, enqueue_emails_from_select, immediate_delivery
 from app.core.config import settings
+from app.core.realtime import fetch_since, notification_hub
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, set_next_cursor
+from app.models.notification import Notification, NotificationArchive, NotificationPreference
+from app.models.user import User, Profile, UserRole
+from app.schemas.notification import NotificationCreate, NotificationResponse, NotificationUpdate, NotificationBroadcast, NotificationBroadcastResult, NotificationMarkRead, NotificationPreferenceUpdate, NotificationPreferenceResponse
 
 router = APIRouter()
 
@@ -21,38 +23,201 @@ def create_notification(notification: NotificationCreate, db: Session = Depends(
     data = notification.dict()
     db_notification = Notification(user_id=data.get('user_id'), title=data.get('title'), message=data.get('message'))
     db.add(db_notification)
+    user = db.query(User).filter(User.id == data.get('user_id')).first()
+    if user:
+        # Sent by the outbox workers once this transaction commits
+        enqueue_email(db, user.email, data.get('title') or 'Message from TPO', data.get('message') or '', user_id=user.id)
     db.commit()
     db.refresh(db_notification)
-    try:
-        user = db.query(User).filter(User.id == data.get('user_id')).first()
-        if user:
-            _send_email(user.email, data.get('title') or 'Message from TPO', data.get('message') or '')
-    except Exception as e:
-        print(f"Send after create failed: {e}")
     return db_notification
 
+def _cohort(payload: NotificationBroadcast):
+    """Approved students matching the broadcast's degree/year filters, as a select of (user_id, email)."""
+    query = (
+        select(User.id, User.email)
+        .join(Profile, Profile.user_id == User.id)
+        .where(User.role == UserRole.STUDENT, User.is_approved == True, Profile.is_approved == True)
+    )
+    if payload.degrees:
+        query = query.where(func.lower(func.trim(Profile.degree)).in_([d.strip().lower() for d in payload.degrees]))
+    if payload.years:
+        query = query.where(func.lower(func.trim(Profile.year)).in_([y.strip().lower() for y in payload.years]))
+    return query
+
+@router.post("/broadcast", response_model=NotificationBroadcastResult)
+def broadcast_notification(payload: NotificationBroadcast, db: Session = Depends(get_db)):
+    # The cohort is resolved inside each INSERT ... SELECT; a broadcast is two
+    # statements however many students it reaches
+    cohort = _cohort(payload).subquery()
+    recipients = db.execute(
+        insert(Notification).from_select(
+            ["user_id", "title", "message", "notification_type", "is_read", "related_id", "related_type"],
+            select(
+                cohort.c.id,
+                literal(payload.title),
+                literal(payload.message),
+                literal(payload.notification_type, Notification.notification_type.type),
+                literal(False),
+                literal(payload.related_id, Notification.related_id.type),
+                literal(payload.related_type, Notification.related_type.type),
+            ),
+        )
+    ).rowcount
+    emails_queued = 0
+    if payload.send_email and recipients:
+        emails_queued = enqueue_emails_from_select(
+            db,
+            select(cohort.c.email, literal(payload.title), literal(payload.message))
+            .where(immediate_delivery(cohort.c.id)),
+        )
+    db.commit()
+    return NotificationBroadcastResult(recipients=recipients, emails_queued=emails_queued)
+
 @router.post("/send-email")
-def send_email_direct(email: str, subject: str, message: str):
-    ok = _send_email(email, subject, message)
-    return {"email_sent": ok}
+def send_email_direct(email: str, subject: str, message: str, db: Session = Depends(get_db)):
+    queued = enqueue_email(db, email, subject, message)
+    db.commit()
+    return {"email_queued": queued}
+
+@router.get("/stream/{user_id}")
+async def stream_notifications(user_id: int, last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """Server-sent events carrying each new notification for the user as it is created.
+
+    Browsers reconnect automatically and send Last-Event-ID; anything created
+    while they were away is replayed from the table before live events resume.
+    """
+    async def events():
+        # Subscribed inside the generator so the finally below always runs: a
+        # client gone before the body starts never subscribes, and a failed
+        # backlog fetch still unsubscribes. Subscribing before the fetch means
+        # nothing created in between is missed.
+        sub = notification_hub.subscribe(user_id)
+        try:
+            backlog = []
+            if last_event_id and last_event_id.isdigit():
+                backlog = await asyncio.to_thread(fetch_since, [user_id], int(last_event_id))
+            yield "retry: 3000\n\n"
+            replayed = set()
+            for _, row_id, body in backlog:
+                replayed.add(row_id)
+                yield f"id: {row_id}\nevent: notification\ndata: {body}\n\n"
+            while not sub.overflowed:
+                try:
+                    row_id, body = await asyncio.wait_for(sub.queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                if row_id not in replayed:
+                    yield f"id: {row_id}\nevent: notification\ndata: {body}\n\n"
+        finally:
+            notification_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/by-user/{user_id}", response_model=List[NotificationResponse])
-def get_notifications_by_user(user_id: int, db: Session = Depends(get_db)):
-    notifications = db.query(Notification).filter(Notification.user_id == user_id).order_by(Notification.created_at.desc()).all()
+def get_notifications_by_user(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    q = db.query(Notification).filter(Notification.user_id == user_id)
+    notifications, next_cursor = keyset_page(q, Notification.created_at, Notification.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return notifications
+
+@router.get("/preferences/{user_id}", response_model=NotificationPreferenceResponse)
+def get_notification_preferences(user_id: int, db: Session = Depends(get_db)):
+    delivery = db.query(NotificationPreference.email_delivery).filter(NotificationPreference.user_id == user_id).scalar()
+    return NotificationPreferenceResponse(user_id=user_id, email_delivery=delivery or "immediate")
+
+@router.put("/preferences/{user_id}", response_model=NotificationPreferenceResponse)
+def update_notification_preferences(user_id: int, payload: NotificationPreferenceUpdate, db: Session = Depends(get_db)):
+    stmt = pg_insert(NotificationPreference).values(user_id=user_id, email_delivery=payload.email_delivery, last_digest_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationPreference.user_id],
+        set_={
+            "email_delivery": stmt.excluded.email_delivery,
+            # Switching from immediate starts a fresh window: earlier notifications were already emailed
+            "last_digest_at": case(
+                (NotificationPreference.email_delivery == "immediate", func.now()),
+                else_=NotificationPreference.last_digest_at,
+            ),
+        },
+    )
+    try:
+        db.execute(stmt)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+    return NotificationPreferenceResponse(user_id=user_id, email_delivery=payload.email_delivery)
+
+@router.get("/archive/by-user/{user_id}", response_model=List[NotificationResponse])
+def get_archived_notifications_by_user(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    # Older history moved out of the hot table by the retention task
+    q = db.query(NotificationArchive).filter(NotificationArchive.user_id == user_id)
+    notifications, next_cursor = keyset_page(q, NotificationArchive.created_at, NotificationArchive.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
     return notifications
 
+def _unread_count(db: Session, user_id: int) -> int:
+    # Matches the partial index on unread rows, so this never touches read history
+    return db.query(func.count()).select_from(Notification).filter(
+        Notification.user_id == user_id, Notification.is_read == False
+    ).scalar()
+
+@router.get("/unread-count/{user_id}")
+def get_unread_count(user_id: int, db: Session = Depends(get_db)):
+    return {"user_id": user_id, "unread": _unread_count(db, user_id)}
+
 @router.put("/read-all/{user_id}")
 def mark_all_read(user_id: int, db: Session = Depends(get_db)):
     try:
-        db.query(Notification).filter(Notification.user_id == user_id, Notification.is_read == False).update({ Notification.is_read: True }, synchronize_session=False)
+        db.query(Notification).filter(Notification.user_id == user_id, Notification.is_read == False).update({ Notification.is_read: True, Notification.read_at: func.now() }, synchronize_session=False)
         db.commit()
         return { "success": True }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to mark all read: {e}")
 
+@router.put("/read")
+def mark_read(payload: NotificationMarkRead, db: Session = Depends(get_db)):
+    """Mark several of a user's notifications read in one statement; returns the new unread count."""
+    updated = db.execute(
+        update(Notification)
+        .where(
+            Notification.id.in_(payload.notification_ids),
+            Notification.user_id == payload.user_id,
+            Notification.is_read == False,
+        )
+        .values(is_read=True, read_at=func.now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    unread = _unread_count(db, payload.user_id)
+    db.commit()
+    return {"updated": updated, "unread": unread}
+
 @router.get("/", response_model=List[NotificationResponse])
-def get_notifications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    notifications = db.query(Notification).offset(skip).limit(limit).all()
+def get_notifications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    notifications, next_cursor = keyset_page(db.query(Notification), Notification.created_at, Notification.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
     return notifications
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
@@ -85,58 +250,3 @@ def delete_notification(notification_id: int, db: Session = Depends(get_db)):
     db.delete(db_notification)
     db.commit()
     return {"message": "Notification deleted successfully"}
-def _send_resend(to_email: str, subject: str, body: str) -> bool:
-    api_key = settings.RESEND_API_KEY or os.getenv('RESEND_API_KEY', '')
-    from_addr = settings.RESEND_FROM or os.getenv('RESEND_FROM', '') or (settings.SMTP_FROM or os.getenv('SMTP_FROM', ''))
-    if not api_key or not from_addr:
-        return False
-    try:
-        data = json.dumps({
-            "from": from_addr,
-            "to": to_email,
-            "subject": subject or 'Message from TPO',
-            "html": f"<p>{body or ''}</p>"
-        }).encode('utf-8')
-        req = urllib.request.Request('https://api.resend.com/emails', data=data, method='POST')
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('Authorization', f'Bearer {api_key}')
-        with urllib.request.urlopen(req) as resp:
-            return 200 <= resp.getcode() < 300
-    except Exception as e:
-        print(f"Resend send failed: {e}")
-        return False
-
-def _send_email(to_email: str, subject: str, body: str) -> bool:
-    host = settings.SMTP_HOST or os.getenv('SMTP_HOST', '')
-    user = settings.SMTP_USER or os.getenv('SMTP_USER', '')
-    pwd = settings.SMTP_PASS or os.getenv('SMTP_PASS', '')
-    from_addr = settings.SMTP_FROM or os.getenv('SMTP_FROM', '') or user
-    try:
-        port = int(settings.SMTP_PORT or int(os.getenv('SMTP_PORT', '587')))
-    except Exception:
-        port = 587
-    if not host or not user or not pwd or not to_email:
-        return False
-    try:
-        msg = EmailMessage()
-        msg['From'] = from_addr
-        msg['To'] = to_email
-        msg['Subject'] = subject or 'Message from TPO'
-        msg.set_content(body or '')
-        if port == 465:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(host, port, context=context) as server:
-                server.login(user, pwd)
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(host, port) as server:
-                server.ehlo()
-                server.starttls()
-                server.login(user, pwd)
-                server.send_message(msg)
-        return True
-    except Exception as e:
-        # Log only; do not raise to keep API success
-        print(f"Email send failed: {e}")
-        # Fallback to Resend if configured
-        return _send_resend(to_email, subject, body)
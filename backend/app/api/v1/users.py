@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from typing import Optional
 from sqlalchemy.orm import Session
@@ -8,8 +10,7 @@ from app.db.session import get_db
 from app.models.user import User, Profile, UserRole
 from app.models.notification import Notification
 from app.core.config import settings
-import smtplib, ssl
-from email.message import EmailMessage
+from app.core.outbox import enqueue_email
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, ProfileCreate, ProfileResponse, ProfileUpdate
 from app.core.config import settings
 
@@ -298,50 +299,13 @@ def tpo_approve_profile(user_id: int, db: Session = Depends(get_db)):
         db.refresh(db_user)
     return { "user_id": user_id, "is_approved": True }
 
-def _send_email(to_email: str, subject: str, body: str) -> bool:
-    host = settings.SMTP_HOST
-    user = settings.SMTP_USER
-    pwd = settings.SMTP_PASS
-    from_addr = settings.SMTP_FROM or user
-    port = int(getattr(settings, 'SMTP_PORT', 587))
-    try:
-        msg = EmailMessage()
-        msg['From'] = from_addr
-        msg['To'] = to_email
-        msg['Subject'] = subject or 'Profile Rejected'
-        msg.set_content(body or '')
-        if port == 465:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(host, port, context=context) as server:
-                server.login(user, pwd)
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(host, port) as server:
-                server.ehlo(); server.starttls(); server.login(user, pwd); server.send_message(msg)
-        return True
-    except Exception as e:
-        print(f"Email send failed (users.reject): {e}")
-        return False
-
-@router.put("/tpo/profiles/{user_id}/reject")
-async def tpo_reject_profile(user_id: int, request: Request, reason_q: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def _reject_profile(db: Session, user_id: int, reason: Optional[str]) -> dict:
     db_profile = db.query(Profile).filter(Profile.user_id == user_id).first()
     if not db_profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    db_profile.is_approved = True
     db_profile.is_approved = False
-    msg_in = None
-    if not msg_in:
-        try:
-            payload = await request.json()
-            if isinstance(payload, dict):
-                msg_in = payload.get('reason')
-        except Exception:
-            pass
-    if msg_in:
-        db_profile.approval_notes = msg_in
-    elif reason_q:
-        db_profile.approval_notes = reason_q
+    if reason:
+        db_profile.approval_notes = reason
     db.commit()
     db.refresh(db_profile)
     db_user = db.query(User).filter(User.id == user_id).first()
@@ -349,27 +313,30 @@ async def tpo_reject_profile(user_id: int, request: Request, reason_q: Optional[
         db_user.is_approved = False
         db.commit()
         db.refresh(db_user)
-        email_sent = False
+        email_queued = False
         try:
-            msg = None
-            msg = None
-            if not msg:
-                try:
-                    payload = await request.json()
-                    if isinstance(payload, dict):
-                        msg = payload.get('reason')
-                except Exception:
-                    pass
-            if not msg:
-                msg = reason_q
-            note = Notification(user_id=user_id, title='Profile Rejected', message=(msg or 'Your profile was rejected'))
-            db.add(note); db.commit(); db.refresh(note)
-            email_sent = _send_email(db_user.email, 'Profile Rejected', note.message)
+            note = Notification(user_id=user_id, title='Profile Rejected', message=(reason or 'Your profile was rejected'))
+            db.add(note)
+            email_queued = enqueue_email(db, db_user.email, 'Profile Rejected', note.message, user_id=user_id)
+            db.commit()
         except Exception as e:
+            db.rollback()
             print(f"Profile reject notify failed: {e}")
-        return { "user_id": user_id, "is_approved": False, "email_sent": email_sent }
+        return { "user_id": user_id, "is_approved": False, "email_queued": email_queued }
     return { "user_id": user_id, "is_approved": False }
 
+@router.put("/tpo/profiles/{user_id}/reject")
+async def tpo_reject_profile(user_id: int, request: Request, reason_q: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    msg = None
+    try:
+        payload = await request.json()
+        if isinstance(payload, dict):
+            msg = payload.get('reason')
+    except Exception:
+        pass
+    # The database work blocks, so it runs in a thread rather than on the event loop
+    return await asyncio.to_thread(_reject_profile, db, user_id, msg or reason_q)
+
 # TPO: Approved students list
 @router.get("/tpo/approved-students")
 def tpo_approved_students(db: Session = Depends(get_db)):
@@ -0,0 +1,261 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.cache_version import CacheVersion
+
+class CacheBackend:
+    """Minimal key/value interface the response caches are written against."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any) -> bool:
+        """Set `key` only if it does not exist yet; returns whether it was set."""
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-process LRU bounded by entry count."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def add(self, key: str, value: Any) -> bool:
+        with self._lock:
+            if key in self._data:
+                return False
+            self._data[key] = (value, None)
+            return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            value = int(value) + 1
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            return value
+
+class RedisCache(CacheBackend):
+    """Shared backend so every worker sees the same versions and bodies."""
+
+    def __init__(self, url: str, prefix: str = "prepsphere:"):
+        import redis  # optional dependency, only needed when CACHE_URL is set
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._client.set(self._prefix + key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def add(self, key: str, value: Any) -> bool:
+        return bool(self._client.set(self._prefix + key, value, nx=True))
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(self._prefix + key))
+
+class PostgresVersionStore(CacheBackend):
+    """Cache versions kept in the cache_versions table, shared by every worker on the database.
+
+    Used when no CACHE_URL is configured: it holds only version counters, never
+    bodies, and each read is a primary-key lookup.
+    """
+
+    def get(self, key: str) -> Optional[int]:
+        with engine.connect() as conn:
+            return conn.execute(select(CacheVersion.version).where(CacheVersion.key == key)).scalar()
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        stmt = pg_insert(CacheVersion).values(key=key, version=int(value))
+        with engine.begin() as conn:
+            conn.execute(stmt.on_conflict_do_update(index_elements=[CacheVersion.key], set_={"version": stmt.excluded.version}))
+
+    def delete(self, key: str) -> None:
+        with engine.begin() as conn:
+            conn.execute(CacheVersion.__table__.delete().where(CacheVersion.key == key))
+
+    def add(self, key: str, value: Any) -> bool:
+        stmt = pg_insert(CacheVersion).values(key=key, version=int(value)).on_conflict_do_nothing()
+        with engine.begin() as conn:
+            return conn.execute(stmt).rowcount == 1
+
+    def incr(self, key: str) -> int:
+        stmt = pg_insert(CacheVersion).values(key=key, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.key], set_={"version": CacheVersion.version + 1}
+        ).returning(CacheVersion.version)
+        with engine.begin() as conn:
+            return conn.execute(stmt).scalar_one()
+
+def _shared_backend() -> Optional[CacheBackend]:
+    if not settings.CACHE_URL:
+        return None
+    try:
+        return RedisCache(settings.CACHE_URL)
+    except Exception as e:
+        print(f"Startup warning: shared cache unavailable, using in-process cache only: {e}")
+        return None
+
+class VersionedCache:
+    """Response cache for one namespace whose entries are invalidated by bumping a version.
+
+    Writers call `bump()` after committing; readers derive their key (and ETag)
+    from the current version, so stale entries are never served and simply age
+    out of the LRU. Versions always live in a store every worker shares (Redis
+    when configured, else Postgres); bodies are kept in the local LRU and, with
+    Redis, in the shared backend as well.
+    """
+
+    def __init__(self, namespace: str, local: CacheBackend, versions: CacheBackend,
+                 shared: Optional[CacheBackend] = None, ttl: Optional[int] = None):
+        self.namespace = namespace
+        self.local = local
+        self.versions = versions
+        self.shared = shared
+        self.ttl = ttl
+        self._version_key = f"{namespace}:version"
+
+    def _scope_key(self, scope: Optional[str]) -> str:
+        return self._version_key if scope is None else f"{self._version_key}:{scope}"
+
+    def _seed(self, key: str) -> None:
+        # A missing counter (first use, or a flushed Redis) restarts from the
+        # clock rather than 0, so ETags and bodies from before can never match again
+        self.versions.add(key, time.time_ns() // 1000)
+
+    def version(self, scope: Optional[str] = None) -> Optional[int]:
+        """Current version of the namespace, or of one `scope` (e.g. a user) within it.
+
+        None when the version store is unreachable: callers must then skip
+        the cache and ETags, since no worker could tell a stale copy apart.
+        """
+        key = self._scope_key(scope)
+        try:
+            value = self.versions.get(key)
+            if value is None:
+                self._seed(key)
+                value = self.versions.get(key)
+            return int(value) if value is not None else None
+        except Exception as e:
+            print(f"Cache version read failed ({self.namespace}): {e}")
+            return None
+
+    def bump(self, scope: Optional[str] = None) -> Optional[int]:
+        key = self._scope_key(scope)
+        try:
+            self._seed(key)
+            return self.versions.incr(key)
+        except Exception as e:
+            print(f"Cache version bump failed ({self.namespace}): {e}")
+            return None
+
+    def etag(self, version: Union[int, str], variant: str) -> str:
+        digest = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+        return f'"{self.namespace}-{version}-{digest}"'
+
+    def _key(self, version: Union[int, str], variant: str) -> str:
+        return f"{self.namespace}:{version}:{variant}"
+
+    def get(self, version: Union[int, str], variant: str) -> Optional[bytes]:
+        key = self._key(version, variant)
+        body = self.local.get(key)
+        if body is None and self.shared:
+            try:
+                body = self.shared.get(key)
+            except Exception:
+                body = None
+            if body is not None:
+                self.local.set(key, body, self.ttl)
+        return body
+
+    def set(self, version: Union[int, str], variant: str, body: bytes) -> None:
+        key = self._key(version, variant)
+        self.local.set(key, body, self.ttl)
+        if self.shared:
+            try:
+                self.shared.set(key, body, self.ttl)
+            except Exception:
+                pass
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+_local = MemoryCache(settings.CACHE_MAX_ENTRIES)
+_shared = _shared_backend()
+
+def store_get(key: str) -> Optional[Any]:
+    """Read a value from the shared backend when configured, else the local LRU."""
+    if _shared:
+        try:
+            return _shared.get(key)
+        except Exception:
+            pass
+    return _local.get(key)
+
+def store_set(key: str, value: Any, ttl: Optional[int] = None) -> None:
+    if _shared:
+        try:
+            _shared.set(key, value, ttl)
+            return
+        except Exception:
+            pass
+    _local.set(key, value, ttl)
+
+# Without Redis the versions still have to be shared across workers, so they go to Postgres
+_versions = _shared or PostgresVersionStore()
+
+job_feed_cache = VersionedCache("jobs-feed", _local, _versions, _shared, ttl=settings.CACHE_TTL_SECONDS)
+# Bumped per user on registration/interview changes, globally when an event or job is edited
+calendar_cache = VersionedCache("calendar", _local, _versions, _shared, ttl=settings.CACHE_TTL_SECONDS)
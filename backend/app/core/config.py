@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Union
+from typing import Dict, List, Union
 import os
 
 class Settings(BaseSettings):
@@ -29,6 +29,16 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: str = ""
     R2_BUCKET_NAME: str = ""
     R2_PUBLIC_BASE_URL: str = ""  # e.g., https://cdn.example.com or https://<bucket>.<accountid>.r2.cloudflarestorage.com
+    # One storage client is shared by every request thread in the process
+    R2_MAX_POOL_CONNECTIONS: int = 50  # keep >= the threadpool size so requests never queue for a socket
+    R2_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    R2_READ_TIMEOUT_SECONDS: float = 60.0
+    R2_MAX_ATTEMPTS: int = 4  # total attempts, including the first
+    R2_RETRY_MODE: str = "standard"  # or "adaptive" to also throttle client-side on 429/503
+    R2_LISTING_CACHE_SECONDS: int = 30  # how long a user's listed object keys are trusted
+    R2_UPLOAD_URL_EXPIRE_SECONDS: int = 600  # lifetime of presigned browser uploads
+    R2_IO_THREADS: int = 16  # threads for uploads proxied through the API
+    R2_IO_QUEUE_SIZE: int = 64  # further uploads wait for a thread; beyond that they get 503
     
     # SMTP for email notifications
     SMTP_HOST: str = ""
@@ -36,9 +46,56 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASS: str = ""
     SMTP_FROM: str = ""
+    SMTP_STARTTLS: bool = True  # disable only for local SMTP stand-ins
     # Resend API fallback
     RESEND_API_KEY: str = ""
     RESEND_FROM: str = ""
+    # Email outbox workers (per process); sends are rate limited across the pool
+    EMAIL_OUTBOX_WORKERS: int = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    EMAIL_SEND_LEASE_SECONDS: int = 600  # a claimed email is retried if its worker dies
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_RATE_PER_SECOND: float = 10.0  # 0 disables the limit
+    EMAIL_SMTP_IDLE_SECONDS: int = 60  # close pooled SMTP connections idle this long
+    EMAIL_SENT_RETENTION_DAYS: int = 7  # sent outbox rows older than this are deleted; 0 keeps them
+    EMAIL_RETENTION_INTERVAL_SECONDS: int = 3600
+
+    # IANA zone the campus works in: event dates and free-form event times are local wall-clock time here
+    CAMPUS_TIMEZONE: str = "Asia/Kolkata"
+
+    # Background scheduler (runs in every worker; tasks coordinate via advisory locks)
+    SCHEDULER_ENABLED: bool = True
+    JOB_EXPIRY_INTERVAL_SECONDS: int = 300
+    EVENT_REMINDER_INTERVAL_SECONDS: int = 60
+    EVENT_REMINDER_OFFSETS_MINUTES: List[int] = [24 * 60, 60]  # before Event.event_date
+
+    # Notification retention: rows older than this many days (per type) move to
+    # notifications_archive; archived rows are deleted after the archive period. 0 keeps forever.
+    NOTIFICATION_RETENTION_DAYS: Dict[str, int] = {
+        "job_alert": 30,
+        "event_reminder": 14,
+        "application_update": 180,
+        "interview_scheduled": 180,
+        "profile_approved": 180,
+        "profile_rejected": 180,
+        "system": 90,
+    }
+    NOTIFICATION_ARCHIVE_RETENTION_DAYS: int = 365
+    NOTIFICATION_RETENTION_INTERVAL_SECONDS: int = 3600
+    NOTIFICATION_DIGEST_INTERVAL_SECONDS: int = 300  # how often due hourly/daily digests are checked
+
+    # Server-sent notification streams
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: int = 15
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+
+    # Response caching; cache versions are always shared (Postgres, or Redis when CACHE_URL
+    # is set, e.g. redis://host:6379/0, which also shares cached bodies across workers)
+    CACHE_URL: str = ""
+    CACHE_MAX_ENTRIES: int = 256
+    CACHE_TTL_SECONDS: int = 300
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,109 @@
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Iterable, List, NamedTuple, Optional, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import settings
+
+DEFAULT_DURATION = timedelta(hours=1)
+_TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p")
+
+class CalendarEntry(NamedTuple):
+    uid: str
+    start: datetime
+    summary: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    url: Optional[str] = None
+    duration: timedelta = DEFAULT_DURATION
+
+def campus_timezone() -> tzinfo:
+    try:
+        return ZoneInfo(settings.CAMPUS_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+def combine_event_time(event_date: Union[date, datetime], event_time: Optional[str]) -> datetime:
+    """The moment an event starts, as an aware datetime.
+
+    The Node server stores the day as a bare date (midnight) and the start as a
+    free-form local time such as "2:30 PM"; both are campus wall-clock time, so
+    they are combined in CAMPUS_TIMEZONE. A date that already carries a time of
+    day is a real timestamp and is returned unchanged.
+    """
+    tz = campus_timezone()
+    if isinstance(event_date, datetime):
+        if event_date.tzinfo is not None:
+            # timestamptz comes back in the session zone; midnight UTC there means "date only"
+            utc = event_date.astimezone(timezone.utc)
+            if utc.time() != time(0):
+                return event_date
+            day = utc.date()
+        elif event_date.time() != time(0):
+            return event_date.replace(tzinfo=tz)
+        else:
+            day = event_date.date()
+    else:
+        day = event_date
+    start = time(0)
+    for fmt in _TIME_FORMATS:
+        try:
+            start = datetime.strptime((event_time or "").strip().upper(), fmt).time()
+            break
+        except ValueError:
+            continue
+    return datetime.combine(day, start, tzinfo=tz)
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def _fold(line: str) -> List[str]:
+    # RFC 5545 limits content lines to 75 octets; continuations start with a space
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return [line]
+    out, start, width = [], 0, 75
+    while start < len(raw):
+        end = min(start + width, len(raw))
+        # Never split a multi-byte character
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        out.append(("" if not out else " ") + raw[start:end].decode("utf-8"))
+        start, width = end, 74
+    return out
+
+def _utc(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def render_calendar(name: str, entries: Iterable[CalendarEntry], stamp: Optional[datetime] = None) -> bytes:
+    stamp_str = _utc(stamp or datetime.now(timezone.utc))
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{settings.PROJECT_NAME}//Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+        # Times below are exact UTC instants; this only tells clients which zone to display
+        f"X-WR-TIMEZONE:{settings.CAMPUS_TIMEZONE}",
+    ]
+    for e in entries:
+        lines += ["BEGIN:VEVENT", f"UID:{e.uid}", f"DTSTAMP:{stamp_str}", f"DTSTART:{_utc(e.start)}", f"DTEND:{_utc(e.start + e.duration)}"]
+        lines.append(f"SUMMARY:{_escape(e.summary)}")
+        if e.description:
+            lines.append(f"DESCRIPTION:{_escape(e.description)}")
+        if e.location:
+            lines.append(f"LOCATION:{_escape(e.location)}")
+        if e.url:
+            lines.append(f"URL:{e.url}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    folded = [part for line in lines for part in _fold(line)]
+    return ("\r\n".join(folded) + "\r\n").encode("utf-8")
@@ -0,0 +1,45 @@
+import json
+from datetime import timedelta
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+def lookup(db: Session, key: str) -> Optional[Tuple[str, Any]]:
+    """The (fingerprint, response) stored under `key`, unless it has expired."""
+    row = db.execute(
+        select(IdempotencyKey.fingerprint, IdempotencyKey.response)
+        .where(IdempotencyKey.key == key, IdempotencyKey.expires_at > func.now())
+    ).first()
+    return (row.fingerprint, json.loads(row.response)) if row else None
+
+def remember(db: Session, key: str, fingerprint: str, response: Any, ttl_seconds: int) -> None:
+    """Store the response in the caller's transaction, so it exists exactly when the write it describes does.
+
+    An expired record under the same key is replaced; a live one is kept.
+    """
+    stmt = pg_insert(IdempotencyKey).values(
+        key=key,
+        fingerprint=fingerprint,
+        response=json.dumps(response),
+        expires_at=func.now() + timedelta(seconds=ttl_seconds),
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.key],
+        set_={"fingerprint": stmt.excluded.fingerprint, "response": stmt.excluded.response, "expires_at": stmt.excluded.expires_at},
+        where=IdempotencyKey.expires_at <= func.now(),
+    ))
+
+def purge_expired_idempotency_keys() -> int:
+    """Delete expired records; returns how many were removed."""
+    db = SessionLocal()
+    try:
+        removed = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())).rowcount
+        db.commit()
+        return removed
+    finally:
+        db.close()
@@ -0,0 +1,133 @@
+import json
+import smtplib
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from email.message import EmailMessage
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+# (to_email, subject, body)
+Mail = Tuple[str, str, str]
+
+def smtp_configured() -> bool:
+    # Credentials are optional so a local SMTP stand-in works without AUTH,
+    # but every message still needs a From address
+    return bool(settings.SMTP_HOST and (settings.SMTP_FROM or settings.SMTP_USER))
+
+def resend_configured() -> bool:
+    return bool(settings.RESEND_API_KEY and (settings.RESEND_FROM or settings.SMTP_FROM))
+
+def mail_configured() -> bool:
+    return smtp_configured() or resend_configured()
+
+def _build_message(to_email: str, subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg['From'] = settings.SMTP_FROM or settings.SMTP_USER
+    msg['To'] = to_email
+    msg['Subject'] = subject or 'Message from TPO'
+    msg.set_content(body or '')
+    return msg
+
+def open_smtp() -> smtplib.SMTP:
+    port = int(settings.SMTP_PORT or 587)
+    if port == 465:
+        server = smtplib.SMTP_SSL(settings.SMTP_HOST, port, context=ssl.create_default_context(), timeout=30)
+    else:
+        server = smtplib.SMTP(settings.SMTP_HOST, port, timeout=30)
+        server.ehlo()
+        if settings.SMTP_STARTTLS:
+            server.starttls()
+    if settings.SMTP_USER:
+        server.login(settings.SMTP_USER, settings.SMTP_PASS)
+    return server
+
+def is_permanent_failure(exc: Exception) -> bool:
+    """True for 5xx rejections, which will fail the same way on every retry."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    code = getattr(exc, "smtp_code", None)
+    if code is None and isinstance(exc, urllib.error.HTTPError):
+        # Resend answers 4xx for bad requests and 429/5xx for transient trouble
+        return 400 <= exc.code < 500 and exc.code != 429
+    return isinstance(code, int) and code >= 500
+
+def send_resend(to_email: str, subject: str, body: str) -> None:
+    """Send one email through the Resend HTTP API; raises on failure."""
+    data = json.dumps({
+        "from": settings.RESEND_FROM or settings.SMTP_FROM,
+        "to": to_email,
+        "subject": subject or 'Message from TPO',
+        "html": f"<p>{body or ''}</p>"
+    }).encode('utf-8')
+    req = urllib.request.Request('https://api.resend.com/emails', data=data, method='POST')
+    req.add_header('Content-Type', 'application/json')
+    req.add_header('Authorization', f'Bearer {settings.RESEND_API_KEY}')
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        resp.read()
+
+class SmtpSession:
+    """One authenticated SMTP connection, kept open across batches.
+
+    Opening a session (TCP, TLS, AUTH) costs several round trips, so a worker
+    holds on to it and only reconnects when the server has dropped it. The
+    session is not thread-safe; each outbox worker owns its own.
+    """
+
+    def __init__(self, idle_seconds: int = 60):
+        self.idle_seconds = idle_seconds
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            # Servers drop idle clients; probe before trusting an old connection
+            try:
+                self._server.noop()
+            except smtplib.SMTPException:
+                self.close()
+        if self._server is None:
+            self._server = open_smtp()
+        return self._server
+
+    def send(self, to_email: str, subject: str, body: str) -> None:
+        msg = _build_message(to_email, subject, body)
+        try:
+            self._connection().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connection().send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
+
+class RateLimiter:
+    """Spaces calls evenly at `rate` per second across every thread that shares it."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,121 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Keeps tech tokens such as "c++", "c#", "node.js" intact
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from have in is it of on or our should the to we will with you your
+experience knowledge skills skill good strong ability must required preferred years year plus
+""".split())
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    out = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        tok = tok.rstrip(".")
+        if (len(tok) > 1 and tok not in _STOPWORDS) or tok in ("c", "r"):
+            out.append(tok)
+    return out
+
+class SkillIndex:
+    """TF-IDF index over a set of documents, scored by cosine similarity.
+
+    Document vectors are stored column-wise (term -> postings) so scoring a
+    query only touches the postings of the query's terms; a ranking over tens
+    of thousands of documents is a handful of NumPy gathers and one bincount.
+    """
+
+    def __init__(self, docs: Sequence[Tuple[Hashable, Optional[str]]]):
+        self.ids: List[Hashable] = [doc_id for doc_id, _ in docs]
+        tokenized = [Counter(tokenize(text)) for _, text in docs]
+        # Queries are projected onto this vocabulary; terms the corpus has never
+        # seen cannot contribute to a cosine score anyway
+        df: Counter = Counter()
+        for counts in tokenized:
+            df.update(counts.keys())
+        self.vocab: Dict[str, int] = {term: i for i, term in enumerate(df)}
+        n_docs = len(tokenized)
+        self.idf = np.array(
+            [math.log((1 + n_docs) / (1 + df[term])) + 1.0 for term in self.vocab],
+            dtype=np.float32,
+        )
+
+        doc_idx, term_idx, tf = [], [], []
+        for i, counts in enumerate(tokenized):
+            for term, c in counts.items():
+                doc_idx.append(i)
+                term_idx.append(self.vocab[term])
+                tf.append(c)
+        doc_arr = np.asarray(doc_idx, dtype=np.int32)
+        term_arr = np.asarray(term_idx, dtype=np.int32)
+        weights = (1.0 + np.log(np.asarray(tf, dtype=np.float32))) * self.idf[term_arr] if tf else np.zeros(0, np.float32)
+        norms = np.sqrt(np.bincount(doc_arr, weights=weights * weights, minlength=len(self.ids)))
+        norms[norms == 0] = 1.0
+        weights = weights / norms[doc_arr]
+
+        order = np.argsort(term_arr, kind="stable")
+        self._post_docs = doc_arr[order]
+        self._post_weights = weights[order].astype(np.float32)
+        self._indptr = np.searchsorted(term_arr[order], np.arange(len(self.vocab) + 1))
+        self._doc_terms = [set(counts) for counts in tokenized]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _query_vector(self, text: Optional[str]) -> Dict[int, float]:
+        counts = Counter(t for t in tokenize(text) if t in self.vocab)
+        vec = {self.vocab[t]: (1.0 + math.log(c)) * float(self.idf[self.vocab[t]]) for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {t: w / norm for t, w in vec.items()}
+
+    def scores(self, text: Optional[str]) -> np.ndarray:
+        qvec = self._query_vector(text)
+        if not qvec or not self.ids:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        docs, weights = [], []
+        for t, qw in qvec.items():
+            lo, hi = self._indptr[t], self._indptr[t + 1]
+            docs.append(self._post_docs[lo:hi])
+            weights.append(self._post_weights[lo:hi] * qw)
+        return np.bincount(np.concatenate(docs), weights=np.concatenate(weights), minlength=len(self.ids))
+
+    def top(self, text: Optional[str], limit: int, min_score: float = 0.0) -> List[Tuple[Hashable, float, List[str]]]:
+        """Return up to `limit` (doc_id, score, matched_terms) tuples, best first."""
+        s = self.scores(text)
+        if not len(s):
+            return []
+        k = min(limit, len(s))
+        idx = np.argpartition(-s, k - 1)[:k]
+        idx = idx[np.argsort(-s[idx], kind="stable")]
+        query_terms = set(tokenize(text))
+        out = []
+        for i in idx:
+            if s[i] <= min_score:
+                break
+            out.append((self.ids[i], float(s[i]), sorted(query_terms & self._doc_terms[i])))
+        return out
+
+class IndexCache:
+    """Keeps the last built index per key until its fingerprint changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Hashable, SkillIndex]] = {}
+
+    def get(self, key: str, fingerprint: Hashable, build) -> SkillIndex:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == fingerprint:
+                return entry[1]
+        index = build()
+        with self._lock:
+            self._entries[key] = (fingerprint, index)
+        return index
+
+index_cache = IndexCache()
@@ -0,0 +1,53 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import Select, exists, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.mailer import Mail, mail_configured
+from app.models.email_outbox import EmailOutbox
+from app.models.notification import NotificationPreference
+
+def immediate_delivery(user_id_col):
+    """SQL condition: the user behind `user_id_col` wants notification emails right away."""
+    return ~exists().where(
+        NotificationPreference.user_id == user_id_col,
+        NotificationPreference.email_delivery != "immediate",
+    )
+
+def enqueue_email(db: Session, to_email: str, subject: str, body: str, user_id: Optional[int] = None) -> bool:
+    """Queue one email in the caller's transaction; it is only sent if the caller commits.
+
+    Returns False (and queues nothing) when there is no recipient, no mail
+    transport is configured, or `user_id` is given and that user takes
+    digests - the notification then goes out with their next digest.
+    """
+    if not to_email or not mail_configured():
+        return False
+    if user_id is not None and not db.execute(select(immediate_delivery(user_id))).scalar():
+        return False
+    db.add(EmailOutbox(to_email=to_email, subject=subject or 'Message from TPO', body=body or ''))
+    return True
+
+def enqueue_emails(db: Session, mails: Iterable[Mail]) -> int:
+    """Queue many emails with one multi-row INSERT; returns how many were queued."""
+    if not mail_configured():
+        return 0
+    rows = [
+        {"to_email": to_email, "subject": subject or 'Message from TPO', "body": body or ''}
+        for to_email, subject, body in mails
+        if to_email
+    ]
+    if rows:
+        db.execute(insert(EmailOutbox), rows)
+    return len(rows)
+
+def enqueue_emails_from_select(db: Session, query: Select) -> int:
+    """Queue one email per row of `query`, which must yield (to_email, subject, body).
+
+    Runs as a single INSERT ... SELECT, so large recipient lists never travel
+    through Python.
+    """
+    if not mail_configured():
+        return 0
+    result = db.execute(insert(EmailOutbox).from_select(["to_email", "subject", "body"], query))
+    return result.rowcount
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(query: Query, created_col, id_col, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of `query` ordered newest first, plus the cursor for the next page.
+
+    Pages are addressed by the `(created_col, id_col)` of the last row seen, so
+    with a matching composite index every page is an index range scan no matter
+    how deep the client has paged. `created_col` must be non-null (all our
+    timestamp columns use a `now()` server default).
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(ts, row_id))
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        # Multi-entity queries yield rows; the paged entity is always first
+        entity = last[0] if isinstance(last, Row) else last
+        next_cursor = encode_cursor(getattr(entity, created_col.key), getattr(entity, id_col.key))
+    return rows, next_cursor
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,177 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.notification import Notification
+from app.schemas.notification import NotificationResponse
+
+CHANNEL = "notifications_new"
+
+# One NOTIFY per INSERT statement (chunked to stay under the 8000 byte payload
+# limit) carrying "user_id:id" pairs, so ORM adds, bulk inserts and
+# INSERT ... SELECT broadcasts are all announced without per-row overhead.
+NOTIFY_TRIGGER_DDL = [
+    f"""CREATE OR REPLACE FUNCTION notify_notifications_inserted() RETURNS trigger AS $$
+    DECLARE
+      chunk text;
+    BEGIN
+      FOR chunk IN
+        SELECT string_agg(user_id || ':' || id, ',')
+        FROM (SELECT user_id, id, (row_number() OVER ()) / 300 AS grp FROM new_rows) s
+        GROUP BY grp
+      LOOP
+        PERFORM pg_notify('{CHANNEL}', chunk);
+      END LOOP;
+      RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS trg_notifications_notify ON notifications",
+    """CREATE TRIGGER trg_notifications_notify AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_notifications_inserted()""",
+]
+
+# (notification id, JSON body)
+Event = Tuple[int, str]
+
+class Subscription:
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize)
+        # Set when the client falls too far behind; the stream then ends and
+        # the client reconnects with Last-Event-ID to catch up from the table
+        self.overflowed = False
+
+def _parse(payload: str) -> Iterable[Tuple[int, int]]:
+    for pair in payload.split(","):
+        user_id, _, row_id = pair.partition(":")
+        if user_id.isdigit() and row_id.isdigit():
+            yield int(user_id), int(row_id)
+
+def _encode(rows: List[Notification]) -> List[Tuple[int, int, str]]:
+    return [
+        (n.user_id, n.id, json.dumps(jsonable_encoder(NotificationResponse.model_validate(n))))
+        for n in rows
+    ]
+
+def fetch_since(user_ids: List[int], after_id: int, limit: int = 500) -> List[Tuple[int, int, str]]:
+    """Notifications for `user_ids` newer than `after_id`, oldest first, as (user_id, id, json)."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Notification)
+            .filter(Notification.user_id.in_(user_ids), Notification.id > after_id)
+            .order_by(Notification.id)
+            .limit(limit)
+            .all()
+        )
+        return _encode(rows)
+    finally:
+        db.close()
+
+def _fetch_ids(ids: List[int]) -> List[Tuple[int, int, str]]:
+    db = SessionLocal()
+    try:
+        return _encode(db.query(Notification).filter(Notification.id.in_(ids)).order_by(Notification.id).all())
+    finally:
+        db.close()
+
+class NotificationHub:
+    """Fans new notifications out to the SSE streams connected to this worker.
+
+    Every worker holds one dedicated connection LISTENing on the notifications
+    channel, watched by the event loop itself, so inserts made by any worker
+    (or a background task) reach every connected client. Rows are loaded only
+    for users with an open stream, in one query per burst of notifications.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self._last_id = 0
+
+    def subscribe(self, user_id: int) -> Subscription:
+        sub = Subscription(user_id, settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        self._subscribers[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.user_id]
+
+    def _publish(self, rows: List[Tuple[int, int, str]]) -> None:
+        for user_id, row_id, body in rows:
+            self._last_id = max(self._last_id, row_id)
+            for sub in self._subscribers.get(user_id, ()):
+                try:
+                    sub.queue.put_nowait((row_id, body))
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+
+    def _connect(self):
+        raw = engine.raw_connection()
+        conn = raw.driver_connection
+        # Detached from the pool: this connection lives as long as the listener
+        raw.detach()
+        conn.rollback()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            conn = None
+            try:
+                conn = await asyncio.to_thread(self._connect)
+                if self._subscribers and self._last_id:
+                    # Catch up on anything inserted while we were disconnected
+                    self._publish(await asyncio.to_thread(fetch_since, list(self._subscribers), self._last_id))
+                readable = asyncio.Event()
+                loop.add_reader(conn.fileno(), readable.set)
+                try:
+                    while True:
+                        await readable.wait()
+                        readable.clear()
+                        conn.poll()
+                        ids = []
+                        while conn.notifies:
+                            for user_id, row_id in _parse(conn.notifies.pop(0).payload):
+                                self._last_id = max(self._last_id, row_id)
+                                if user_id in self._subscribers:
+                                    ids.append(row_id)
+                        if ids:
+                            self._publish(await asyncio.to_thread(_fetch_ids, ids))
+                finally:
+                    loop.remove_reader(conn.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Notification listener error, reconnecting: {e}")
+                await asyncio.sleep(5)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen(), name="notification-hub")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+notification_hub = NotificationHub()
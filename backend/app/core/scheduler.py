@@ -0,0 +1,52 @@
+import asyncio
+import random
+import zlib
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+def try_advisory_xact_lock(db: Session, name: str) -> bool:
+    """Take a transaction-scoped Postgres advisory lock named `name`, without waiting.
+
+    Every worker runs the same scheduled tasks; whichever one gets the lock does
+    the batch and the others skip it. The lock is released on commit/rollback.
+    """
+    key = zlib.crc32(name.encode("utf-8"))
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key}).scalar())
+
+class Scheduler:
+    """Runs registered blocking callables periodically from the event loop.
+
+    Each run is offloaded to a worker thread so database work never blocks
+    request handling; a failing run is logged and retried on the next tick.
+    """
+
+    def __init__(self):
+        self._jobs: List[Tuple[str, float, Callable[[], object]]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, interval_seconds: float, func: Callable[[], object]) -> None:
+        self._jobs.append((name, interval_seconds, func))
+
+    async def _loop(self, name: str, interval: float, func: Callable[[], object]) -> None:
+        # Spread the first run so freshly started workers don't all fire together
+        await asyncio.sleep(random.uniform(0, min(interval, 30)))
+        while True:
+            try:
+                await asyncio.to_thread(func)
+            except Exception as e:
+                print(f"Scheduled task {name} failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        for name, interval, func in self._jobs:
+            self._tasks.append(asyncio.create_task(self._loop(name, interval, func), name=f"scheduler:{name}"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+scheduler = Scheduler()
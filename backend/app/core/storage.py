@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Set, TypeVar
+
+import boto3
+from botocore.config import Config
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_client = None
+_client_lock = threading.Lock()
+
+# Blocking storage calls made on behalf of async endpoints run here, never on
+# the event loop. Slots cap running plus waiting calls so a burst of uploads
+# is turned away instead of queueing without bound.
+_io_executor = ThreadPoolExecutor(max_workers=settings.R2_IO_THREADS, thread_name_prefix="storage-io")
+_io_slots = threading.BoundedSemaphore(settings.R2_IO_THREADS + settings.R2_IO_QUEUE_SIZE)
+
+class StorageBusyError(RuntimeError):
+    """Raised when the storage thread pool and its queue are full."""
+
+def storage_configured() -> bool:
+    return bool(settings.R2_ENDPOINT and settings.R2_ACCESS_KEY_ID and settings.R2_SECRET_ACCESS_KEY and settings.R2_BUCKET_NAME)
+
+def _build_client():
+    # Clients come from a private session: the default boto3 session is not
+    # thread-safe, while the finished client is and can be shared freely
+    session = boto3.session.Session()
+    return session.client(
+        "s3",
+        endpoint_url=settings.R2_ENDPOINT,
+        region_name="auto",
+        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.R2_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.R2_READ_TIMEOUT_SECONDS,
+            retries={"total_max_attempts": settings.R2_MAX_ATTEMPTS, "mode": settings.R2_RETRY_MODE},
+            tcp_keepalive=True,
+        ),
+    )
+
+def get_storage_client():
+    """The process-wide S3 client for R2, built on first use.
+
+    Building a client resolves credentials, loads the service model and sets up
+    a connection pool, which costs far more than most calls made with it, so
+    every request thread shares this one and reuses its kept-alive connections.
+    Returns None when object storage is not configured.
+    """
+    global _client
+    if _client is None:
+        if not storage_configured():
+            return None
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+def reset_storage_client() -> None:
+    """Drop the shared client (e.g. after rotating credentials); the next call builds a new one."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+def list_keys(client, prefix: str) -> Set[str]:
+    """Every object key under `prefix`, one ListObjectsV2 call per 1000 keys."""
+    keys: Set[str] = set()
+    for page in client.get_paginator("list_objects_v2").paginate(Bucket=settings.R2_BUCKET_NAME, Prefix=prefix):
+        keys.update(obj["Key"] for obj in page.get("Contents", ()))
+    return keys
+
+async def run_storage_io(func: Callable[..., T], *args) -> T:
+    """Run a blocking storage call on the bounded storage pool and await its result."""
+    if not _io_slots.acquire(blocking=False):
+        raise StorageBusyError("Too many storage operations in progress")
+    try:
+        future = asyncio.get_running_loop().run_in_executor(_io_executor, func, *args)
+    except BaseException:
+        _io_slots.release()
+        raise
+    # Released when the call finishes, even if the awaiting request went away,
+    # so abandoned uploads still count against the limit while they run
+    future.add_done_callback(lambda _: _io_slots.release())
+    return await future
+
+def shutdown_storage_io() -> None:
+    """Wait for in-flight storage calls to finish; used at application shutdown."""
+    _io_executor.shutdown(wait=True)
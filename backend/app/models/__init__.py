@@ -4,8 +4,12 @@ from app.models.resume import Resume
 from app.models.certificate import Certificate
 from app.models.job import Job, JobApplication, ApplicationStatus
 from app.models.event import Event, EventRegistration
+from app.models.event_reminder import EventReminderLog
+from app.models.email_outbox import EmailOutbox
+from app.models.idempotency import IdempotencyKey
+from app.models.cache_version import CacheVersion
 from app.models.file import FileUpload
-from app.models.notification import Notification, NotificationType
+from app.models.notification import Notification, NotificationArchive, NotificationPreference, NotificationType
 
 __all__ = [
     "User",
@@ -18,7 +22,13 @@ __all__ = [
     "ApplicationStatus",
     "Event",
     "EventRegistration",
+    "EventReminderLog",
+    "EmailOutbox",
+    "IdempotencyKey",
+    "CacheVersion",
     "FileUpload",
     "Notification",
+    "NotificationArchive",
+    "NotificationPreference",
     "NotificationType",
 ]
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, BigInteger
+from app.db.session import Base
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    
+    # e.g. "jobs-feed:version" or "calendar:version:<user id>"
+    key = Column(String(200), primary_key=True)
+    version = Column(BigInteger, nullable=False)
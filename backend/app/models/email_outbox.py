@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, text
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Work queue order; sent and failed rows drop out of the index
+        Index(
+            "ix_email_outbox_due",
+            "next_attempt_at", "id",
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+        # Retention purge order
+        Index("ix_email_outbox_sent_at", "sent_at", postgresql_where=text("status = 'sent'")),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, server_default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -28,11 +31,20 @@ class Event(Base):
 
 class EventRegistration(Base):
     __tablename__ = "event_registrations"
+    __table_args__ = (
+        Index("uq_event_registrations_event_id_user_id", "event_id", "user_id", unique=True),
+        # Waitlist order; small because it only covers waiting rows
+        Index(
+            "ix_event_registrations_waitlist",
+            "event_id", "registered_at", "id",
+            postgresql_where=text("registration_status = 'waitlisted'"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    registration_status = Column(String, default="registered")  # registered, attended, cancelled
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    registration_status = Column(String, default="registered")  # registered, waitlisted, attended, cancelled
     registered_at = Column(DateTime(timezone=True), server_default=func.now())
     attended_at = Column(DateTime(timezone=True), nullable=True)
     
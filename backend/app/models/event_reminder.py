@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class EventReminderLog(Base):
+    __tablename__ = "event_reminder_log"
+    __table_args__ = (
+        # One reminder per event per offset, however many workers race to send it
+        Index("uq_event_reminder_log_event_id_offset", "event_id", "offset_minutes", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    offset_minutes = Column(Integer, nullable=False)
+    sent_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Text, DateTime, Index
+from app.db.session import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    # Namespaced by endpoint, e.g. "applications:<Idempotency-Key header>"
+    key = Column(String(300), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    response = Column(Text, nullable=False)  # JSON replayed on retries
+    expires_at = Column(DateTime(timezone=True), nullable=False)
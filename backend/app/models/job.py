@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.session import Base
 from enum import Enum as PyEnum
 
@@ -12,8 +13,25 @@ class ApplicationStatus(str, PyEnum):
     REJECTED = "rejected"
     WITHDRAWN = "withdrawn"
 
+# Weighted so title/company matches outrank hits buried in the description
+JOB_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(requirements, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_jobs_is_active_application_deadline", "is_active", "application_deadline"),
+        Index("ix_jobs_is_active_location", "is_active", "location"),
+        Index("ix_jobs_is_active_job_type", "is_active", "job_type"),
+        Index("ix_jobs_is_active_company", "is_active", "company"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -30,6 +48,8 @@ class Job(Base):
     total_positions = Column(Integer, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Maintained by Postgres; deferred so normal job queries don't load it
+    search_vector = deferred(Column(TSVECTOR, Computed(JOB_SEARCH_VECTOR_SQL, persisted=True)))
     
     # Relationships
     creator = relationship("User")
@@ -37,10 +57,15 @@ class Job(Base):
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __table_args__ = (
+        Index("ix_job_applications_applied_at_id", "applied_at", "id"),
+        Index("ix_job_applications_job_id_applied_at_id", "job_id", "applied_at", "id"),
+        Index("uq_job_applications_job_id_user_id", "job_id", "user_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=True)
     cover_letter = Column(Text, nullable=True)
     status = Column(Enum(ApplicationStatus), default=ApplicationStatus.PENDING, nullable=False)
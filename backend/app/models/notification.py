@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -15,6 +15,12 @@ class NotificationType(str, PyEnum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_created_at_id", "created_at", "id"),
+        Index("ix_notifications_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Unread badge and mark-all-read; only covers unread rows so it stays tiny
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("is_read = false")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -28,4 +34,34 @@ class Notification(Base):
     read_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="notifications")
\ No newline at end of file
+    user = relationship("User", back_populates="notifications")
+
+class NotificationArchive(Base):
+    """Notifications past their retention period, moved out of the hot table by the retention task."""
+    __tablename__ = "notifications_archive"
+    __table_args__ = (
+        Index("ix_notifications_archive_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notifications_archive_archived_at", "archived_at"),
+    )
+    
+    # Keeps the original notification id
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    notification_type = Column(Enum(NotificationType), nullable=False)
+    is_read = Column(Boolean, default=False)
+    related_id = Column(Integer, nullable=True)
+    related_type = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class NotificationPreference(Base):
+    """Per-user email delivery choice; users without a row get immediate emails."""
+    __tablename__ = "notification_preferences"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    email_delivery = Column(String, nullable=False, server_default="immediate")  # immediate, hourly, daily
+    last_digest_at = Column(DateTime(timezone=True), nullable=True)  # end of the last digest window sent
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
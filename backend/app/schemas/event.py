@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 
 class EventBase(BaseModel):
@@ -18,14 +18,44 @@ class EventUpdate(BaseModel):
     location: Optional[str] = None
     event_date: Optional[datetime] = None
     event_time: Optional[str] = None
+    capacity: Optional[int] = None
     is_active: Optional[bool] = None
 
 class EventResponse(EventBase):
     id: int
+    capacity: Optional[int] = None
+    registered_count: Optional[int] = None
     is_active: bool
     created_by: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EventRegistrationRequest(BaseModel):
+    model_config = ConfigDict(extra='allow')
+    user_id: int
+
+class EventRegistrationResponse(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
+    registration_status: str
+    registered_at: Optional[datetime] = None
+    attended_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class CheckInScan(BaseModel):
+    user_id: int
+    scanned_at: Optional[datetime] = None  # offline scanners send the time of the scan
+
+class CheckInBatch(BaseModel):
+    scans: List[CheckInScan] = Field(..., min_length=1, max_length=5000)
+
+class CheckInResult(BaseModel):
+    user_id: int
+    status: str  # checked_in, already_checked_in, not_registered, waitlisted, cancelled
+    attended_at: Optional[datetime] = None
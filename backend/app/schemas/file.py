@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
 class ResumeUpdate(BaseModel):
@@ -41,3 +41,28 @@ class CertificateResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class UploadTicketRequest(BaseModel):
+    user_id: int
+    filename: str
+    content_type: str
+    size: int  # bytes; the upload must be exactly this long
+
+class UploadTicket(BaseModel):
+    """Presigned PUT the browser sends the file to, straight to object storage."""
+    url: str
+    method: str = "PUT"
+    headers: Dict[str, str]  # send exactly these; Content-Length must equal the declared size
+    key: str
+    max_size: int
+    expires_in: int
+
+class ResumeUploadConfirm(BaseModel):
+    user_id: int
+    key: str
+    filename: str
+
+class CertificateUploadConfirm(BaseModel):
+    user_id: int
+    key: str
+    title: str
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from app.models.job import ApplicationStatus
 
 class JobBase(BaseModel):
     title: str
@@ -9,6 +10,7 @@ class JobBase(BaseModel):
     description: str
     requirements: str
     salary_range: Optional[str] = None
+    job_type: Optional[str] = None
     job_url: Optional[str] = None
 
 class JobCreate(JobBase):
@@ -37,6 +39,23 @@ class JobResponse(JobBase):
     class Config:
         from_attributes = True
 
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+class JobBrowseResponse(BaseModel):
+    items: List[JobResponse]
+    facets: Dict[str, List[FacetCount]]
+    next_cursor: Optional[str] = None
+
+class JobSearchResult(JobResponse):
+    rank: float
+    headline: str
+
+class JobMatchResult(JobResponse):
+    score: float
+    matched_skills: List[str] = []
+
 class JobApplicationBase(BaseModel):
     job_id: int
     user_id: int
@@ -48,11 +67,25 @@ class JobApplicationCreate(JobApplicationBase):
 
 class JobApplicationUpdate(BaseModel):
     status: Optional[str] = None
+    interview_scheduled: Optional[bool] = None
+    interview_date: Optional[datetime] = None
+    interview_notes: Optional[str] = None
+
+class JobApplicationBulkStatusUpdate(BaseModel):
+    status: ApplicationStatus
+    # Target either explicit ids or every application of a job (optionally
+    # narrowed to those currently in `from_status`)
+    application_ids: Optional[List[int]] = None
+    job_id: Optional[int] = None
+    from_status: Optional[ApplicationStatus] = None
+    notify: bool = True
 
 class JobApplicationResponse(JobApplicationBase):
     id: int
     status: str
     applied_at: datetime
+    interview_scheduled: Optional[bool] = None
+    interview_date: Optional[datetime] = None
     
     class Config:
         from_attributes = True
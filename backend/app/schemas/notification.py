@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
+from app.models.notification import NotificationType
 
 class NotificationBase(BaseModel):
     title: str
@@ -13,6 +14,10 @@ class NotificationCreate(NotificationBase):
 class NotificationUpdate(BaseModel):
     is_read: Optional[bool] = None
 
+class NotificationMarkRead(BaseModel):
+    user_id: int
+    notification_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
 class NotificationResponse(NotificationBase):
     id: int
     is_read: bool
@@ -20,3 +25,24 @@ class NotificationResponse(NotificationBase):
     
     class Config:
         from_attributes = True
+
+class NotificationBroadcast(BaseModel):
+    title: str
+    message: str
+    # Empty filters mean every approved student
+    degrees: Optional[List[str]] = None
+    years: Optional[List[str]] = None
+    notification_type: NotificationType = NotificationType.JOB_ALERT
+    related_id: Optional[int] = None
+    related_type: Optional[str] = None
+    send_email: bool = True
+
+class NotificationBroadcastResult(BaseModel):
+    recipients: int
+    emails_queued: int
+
+class NotificationPreferenceUpdate(BaseModel):
+    email_delivery: Literal["immediate", "hourly", "daily"]
+
+class NotificationPreferenceResponse(NotificationPreferenceUpdate):
+    user_id: int
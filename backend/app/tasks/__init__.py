@@ -0,0 +1 @@
+# Background tasks run by app.core.scheduler
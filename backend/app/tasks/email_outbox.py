@@ -0,0 +1,197 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select, update
+
+from app.core.config import settings
+from app.core.mailer import RateLimiter, SmtpSession, is_permanent_failure, resend_configured, send_resend, smtp_configured
+from app.core.scheduler import try_advisory_xact_lock
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox
+
+PURGE_BATCH_SIZE = 1000
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = min(settings.EMAIL_RETRY_MAX_SECONDS, settings.EMAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    # Jitter keeps a burst of failures from retrying in lockstep
+    return timedelta(seconds=base * random.uniform(0.8, 1.2))
+
+def _claim(batch_size: int) -> List:
+    db = SessionLocal()
+    try:
+        # Claimed rows get a lease instead of a lock held across the sends; if
+        # the worker dies, the row becomes due again once the lease runs out
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= func.now())
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due))
+            .values(
+                status="sending",
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=func.now() + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS),
+            )
+            .returning(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject, EmailOutbox.body, EmailOutbox.attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        return rows
+    finally:
+        db.close()
+
+def _record(results: List[dict]) -> None:
+    db = SessionLocal()
+    try:
+        # Bulk UPDATE by primary key: one executemany for the whole batch
+        db.execute(update(EmailOutbox), results)
+        db.commit()
+    finally:
+        db.close()
+
+def _send_one(smtp: Optional[SmtpSession], row) -> None:
+    if smtp is not None:
+        try:
+            smtp.send(row.to_email, row.subject, row.body)
+            return
+        except Exception as e:
+            if is_permanent_failure(e) or not resend_configured():
+                raise
+            print(f"SMTP send failed for outbox email {row.id}, trying Resend: {e}")
+    send_resend(row.to_email, row.subject, row.body)
+
+def drain_outbox(smtp: Optional[SmtpSession] = None, limiter: Optional[RateLimiter] = None,
+                 batch_size: Optional[int] = None) -> int:
+    """Claim one batch of due emails, send it and record the outcome; returns the batch size.
+
+    The batch goes out over `smtp`, which stays open for the next call. Sends
+    that fail transiently are rescheduled with exponential backoff until
+    EMAIL_MAX_ATTEMPTS; 5xx rejections fail immediately.
+    """
+    rows = _claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not rows:
+        return 0
+    own_session = smtp is None and smtp_configured()
+    if own_session:
+        smtp = SmtpSession(settings.EMAIL_SMTP_IDLE_SECONDS)
+    elif not smtp_configured():
+        smtp = None
+    results = []
+    try:
+        for row in rows:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                _send_one(smtp, row)
+                results.append({"id": row.id, "status": "sent", "sent_at": datetime.now(timezone.utc), "last_error": None})
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"[:1000]
+                if is_permanent_failure(e) or row.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                    print(f"Outbox email {row.id} to {row.to_email} failed permanently: {error}")
+                    results.append({"id": row.id, "status": "failed", "last_error": error})
+                else:
+                    results.append({
+                        "id": row.id,
+                        "status": "pending",
+                        "next_attempt_at": datetime.now(timezone.utc) + _retry_delay(row.attempts),
+                        "last_error": error,
+                    })
+    finally:
+        if own_session:
+            smtp.close()
+    _record(results)
+    return len(rows)
+
+def purge_sent_emails(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete sent emails older than EMAIL_SENT_RETENTION_DAYS, in short batches; returns rows deleted.
+
+    Failed rows are kept so they can still be inspected and re-queued.
+    """
+    days = settings.EMAIL_SENT_RETENTION_DAYS
+    if days <= 0:
+        return 0
+    deleted = 0
+    while True:
+        db = SessionLocal()
+        try:
+            if not try_advisory_xact_lock(db, "purge_sent_emails"):
+                return deleted
+            victims = (
+                select(EmailOutbox.id)
+                .where(EmailOutbox.status == "sent", EmailOutbox.sent_at < func.now() - timedelta(days=days))
+                .order_by(EmailOutbox.sent_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            n = db.execute(
+                delete(EmailOutbox).where(EmailOutbox.id.in_(victims)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        deleted += n
+        if n < batch_size:
+            return deleted
+
+class EmailOutboxPool:
+    """Background workers that drain the email outbox.
+
+    Each worker owns one pooled SMTP session and repeatedly claims a batch with
+    SKIP LOCKED, so workers in this and other processes never work on the same
+    email at once. All workers in the process share one rate limiter.
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._limiter = RateLimiter(settings.EMAIL_RATE_PER_SECOND)
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def _run(self) -> None:
+        smtp = SmtpSession(settings.EMAIL_SMTP_IDLE_SECONDS)
+        batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+        try:
+            while not self._stopping.is_set():
+                try:
+                    claimed = await asyncio.to_thread(drain_outbox, smtp, self._limiter, batch_size)
+                except Exception as e:
+                    print(f"Email outbox worker failed: {e}")
+                    claimed = 0
+                if claimed < batch_size:
+                    # Queue drained; drop the connection if it sits unused for long
+                    smtp.close_if_idle()
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), settings.EMAIL_OUTBOX_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            smtp.close()
+
+    def start(self, workers: int) -> None:
+        self._stopping = asyncio.Event()
+        for i in range(workers):
+            self._tasks.append(asyncio.create_task(self._run(), name=f"email-outbox:{i}"))
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        if not self._tasks:
+            return
+        # Let in-flight batches finish and record their outcome; anything cut
+        # off is sent again once its lease expires
+        self._stopping.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+email_outbox_pool = EmailOutboxPool()
@@ -0,0 +1,101 @@
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.ical import campus_timezone, combine_event_time
+from app.core.outbox import enqueue_emails
+from app.db.session import SessionLocal
+from app.models.event import Event, EventRegistration
+from app.models.event_reminder import EventReminderLog
+from app.models.notification import Notification, NotificationType
+from app.models.user import User
+
+# Events store a bare date; its start can be up to a day (plus the campus UTC
+# offset) after the stored midnight, so candidates are fetched with this margin
+_DATE_SLACK = timedelta(days=2)
+
+def _reminder_text(title: str, event_date, event_time: str, location: str) -> str:
+    when = combine_event_time(event_date, event_time).astimezone(campus_timezone()).strftime('%d %b %Y') if event_date else ''
+    return f"Reminder: {title} is on {when} at {event_time} ({location})."
+
+def send_event_reminders() -> int:
+    """Send due reminders for every configured offset; returns notifications created.
+
+    Due windows are measured from the real start time (the stored day and the
+    free-form event time combined in the campus time zone), worked out for the
+    events within a couple of days of the window. Per offset this is then one
+    claim statement, one attendee join and one bulk insert, no matter how
+    many people are registered. Offsets are handled
+    smallest first and each only covers events beyond the next smaller offset,
+    so an event never gets two reminders in the same pass. Emails are queued
+    in the outbox in the same transaction as the notifications.
+    """
+    offsets: List[int] = sorted(set(settings.EVENT_REMINDER_OFFSETS_MINUTES))
+    created = 0
+    mails = []
+    db = SessionLocal()
+    try:
+        now = db.execute(select(func.now())).scalar()
+        candidates = db.execute(
+            select(Event.id, Event.event_date, Event.event_time)
+            .where(
+                Event.is_active == True,
+                Event.event_date > now - _DATE_SLACK,
+                Event.event_date <= now + timedelta(minutes=offsets[-1]) + _DATE_SLACK,
+            )
+        ).all() if offsets else []
+        starts = {c.id: combine_event_time(c.event_date, c.event_time) for c in candidates}
+        lower = now
+        for offset in offsets:
+            upper = now + timedelta(minutes=offset)
+            due = [{"event_id": event_id, "offset_minutes": offset} for event_id, start in starts.items() if lower < start <= upper]
+            lower = upper
+            if not due:
+                continue
+            # Claiming through the unique (event_id, offset) index makes the send
+            # exactly-once even with every worker running this task
+            claimed = db.execute(
+                pg_insert(EventReminderLog)
+                .values(due)
+                .on_conflict_do_nothing(index_elements=["event_id", "offset_minutes"])
+                .returning(EventReminderLog.event_id)
+            ).scalars().all()
+            if not claimed:
+                continue
+            attendees = db.execute(
+                select(
+                    EventRegistration.user_id, User.email, Event.id, Event.title,
+                    Event.event_date, Event.event_time, Event.location,
+                )
+                .join(Event, Event.id == EventRegistration.event_id)
+                .join(User, User.id == EventRegistration.user_id)
+                .where(EventRegistration.event_id.in_(claimed), EventRegistration.registration_status == "registered")
+            ).all()
+            if not attendees:
+                continue
+            rows = []
+            for a in attendees:
+                message = _reminder_text(a.title, a.event_date, a.event_time, a.location)
+                rows.append({
+                    "user_id": a.user_id,
+                    "title": f"Upcoming: {a.title}",
+                    "message": message,
+                    "notification_type": NotificationType.EVENT_REMINDER,
+                    "is_read": False,
+                    "related_id": a.id,
+                    "related_type": "event",
+                })
+                mails.append((a.email, f"Upcoming: {a.title}", message))
+            db.execute(insert(Notification), rows)
+            created += len(rows)
+        enqueue_emails(db, mails)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return created
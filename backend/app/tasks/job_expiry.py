@@ -0,0 +1,44 @@
+from sqlalchemy import text
+
+from app.core.cache import job_feed_cache
+from app.core.scheduler import try_advisory_xact_lock
+from app.db.session import SessionLocal
+
+CLOSE_BATCH_SIZE = 500
+
+_CLOSE_EXPIRED_SQL = text("""
+    UPDATE jobs SET is_active = false, updated_at = now()
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE is_active = true AND application_deadline < now()
+        ORDER BY application_deadline
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+""")
+
+def close_expired_jobs(batch_size: int = CLOSE_BATCH_SIZE) -> int:
+    """Close active jobs whose application deadline has passed, in short batches.
+
+    Each batch is its own transaction so row locks are held briefly; the
+    advisory lock keeps concurrent workers from duplicating the sweep.
+    """
+    closed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            if not try_advisory_xact_lock(db, "close_expired_jobs"):
+                return closed
+            ids = db.execute(_CLOSE_EXPIRED_SQL, {"batch": batch_size}).scalars().all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        closed += len(ids)
+        if ids:
+            job_feed_cache.bump()
+        if len(ids) < batch_size:
+            return closed
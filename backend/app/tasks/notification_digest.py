@@ -0,0 +1,97 @@
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.core.mailer import Mail
+from app.core.outbox import enqueue_emails
+from app.core.scheduler import try_advisory_xact_lock
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationPreference, NotificationType
+from app.models.user import User
+
+DIGEST_BATCH_SIZE = 1000
+DIGEST_WINDOWS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+# Reminders are only useful on time, so they are always emailed immediately
+DIGEST_EXEMPT_TYPES = (NotificationType.EVENT_REMINDER,)
+MAX_ITEMS_PER_DIGEST = 50
+
+def _digest_mail(email: str, items: List[dict]) -> Mail:
+    count = len(items)
+    subject = f"You have {count} new notification{'s' if count != 1 else ''}"
+    lines = [f"- {item['title']}: {item['message']}" for item in items[:MAX_ITEMS_PER_DIGEST]]
+    if count > MAX_ITEMS_PER_DIGEST:
+        lines.append(f"...and {count - MAX_ITEMS_PER_DIGEST} more in the app.")
+    return (email, subject, "Here is what happened since your last digest:\n\n" + "\n".join(lines))
+
+def _digest_batch(db, batch_size: int) -> int:
+    P = NotificationPreference
+    window = case(
+        *[(P.email_delivery == name, span) for name, span in DIGEST_WINDOWS.items()],
+    )
+    due = (
+        select(P.user_id, func.coalesce(P.last_digest_at, func.now() - window).label("since"))
+        .where(
+            P.email_delivery.in_(list(DIGEST_WINDOWS)),
+            or_(P.last_digest_at == None, P.last_digest_at <= func.now() - window),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("due")
+    )
+    # Advancing last_digest_at and reading the window happen in one statement,
+    # so a notification lands in exactly one digest
+    claimed = (
+        update(P)
+        .where(P.user_id == due.c.user_id)
+        .values(last_digest_at=func.now())
+        .returning(P.user_id, due.c.since)
+        .cte("claimed")
+    )
+    item = func.json_build_object("title", Notification.title, "message", Notification.message)
+    rows = db.execute(
+        select(
+            claimed.c.user_id,
+            User.email,
+            func.json_agg(aggregate_order_by(item, Notification.created_at, Notification.id)).filter(Notification.id != None),
+        )
+        .select_from(claimed)
+        .join(User, User.id == claimed.c.user_id)
+        .outerjoin(
+            Notification,
+            (Notification.user_id == claimed.c.user_id)
+            & (Notification.created_at > claimed.c.since)
+            & (Notification.created_at <= func.now())
+            & (Notification.is_read == False)
+            & Notification.notification_type.notin_(DIGEST_EXEMPT_TYPES),
+        )
+        .group_by(claimed.c.user_id, User.email)
+    ).all()
+    mails = [_digest_mail(email, items) for _, email, items in rows if items]
+    enqueue_emails(db, mails)
+    return len(rows)
+
+def send_notification_digests(batch_size: int = DIGEST_BATCH_SIZE) -> int:
+    """Queue one digest email per user whose hourly/daily window has elapsed; returns users processed.
+
+    Each batch is one statement that claims due users and aggregates their
+    unread notifications for the window, plus one multi-row outbox insert.
+    Users with nothing new are still advanced to the next window.
+    """
+    processed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            if not try_advisory_xact_lock(db, "send_notification_digests"):
+                return processed
+            n = _digest_batch(db, batch_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        processed += n
+        if n < batch_size:
+            return processed
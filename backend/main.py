@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI, Response
 from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
@@ -5,7 +7,18 @@ from contextlib import asynccontextmanager
 
 from app.api.v1 import users, jobs, events, files, notifications
 from app.core.config import settings
+from app.core.scheduler import scheduler
+from app.tasks.job_expiry import close_expired_jobs
+from app.tasks.event_reminders import send_event_reminders
+from app.tasks.email_outbox import email_outbox_pool, purge_sent_emails
+from app.tasks.notification_retention import apply_notification_retention
+from app.tasks.notification_digest import send_notification_digests
+from app.core.realtime import NOTIFY_TRIGGER_DDL, notification_hub
+from app.core.mailer import smtp_configured
+from app.core.storage import shutdown_storage_io
+from app.core.idempotency import purge_expired_idempotency_keys
 from app.db.session import engine, Base
+from app.models.job import JOB_SEARCH_VECTOR_SQL
 
 def ensure_db_types():
     try:
@@ -51,6 +64,85 @@ def ensure_db_types():
     except Exception as e:
         print(f"Startup warning: ensure_db_types failed: {e}")
 
+INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_job_applications_job_id ON job_applications (job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_applications_user_id ON job_applications (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_applications_applied_at_id ON job_applications (applied_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_job_applications_job_id_applied_at_id ON job_applications (job_id, applied_at, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_job_applications_job_id_user_id ON job_applications (job_id, user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_created_at_id ON jobs (created_at, id)",
+    f"ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({JOB_SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_is_active_application_deadline ON jobs (is_active, application_deadline)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_is_active_location ON jobs (is_active, location)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_is_active_job_type ON jobs (is_active, job_type)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_is_active_company ON jobs (is_active, company)",
+    "CREATE INDEX IF NOT EXISTS ix_events_created_at_id ON events (created_at, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_event_registrations_event_id_user_id ON event_registrations (event_id, user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_registrations_user_id ON event_registrations (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_registrations_waitlist ON event_registrations (event_id, registered_at, id) WHERE registration_status = 'waitlisted'",
+    "CREATE INDEX IF NOT EXISTS ix_email_outbox_sent_at ON email_outbox (sent_at) WHERE status = 'sent'",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_created_at_id ON notifications (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_created_at_id ON notifications (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_unread ON notifications (user_id) WHERE is_read = false",
+    *NOTIFY_TRIGGER_DDL,
+]
+
+# Duplicates left by double submits must go before a unique index can build.
+# Per (job, student) / (event, student) the row that progressed furthest is
+# kept, so a TPO's decision is never the one discarded; each statement returns
+# how many rows it removed.
+DEDUPE_BEFORE_UNIQUE_INDEX = {
+    "uq_job_applications_job_id_user_id": """
+        WITH ranked AS (
+          SELECT id, row_number() OVER (
+            PARTITION BY job_id, user_id
+            ORDER BY CASE upper(status::text)
+                       WHEN 'ACCEPTED' THEN 5 WHEN 'SHORTLISTED' THEN 4 WHEN 'REJECTED' THEN 3
+                       WHEN 'REVIEWED' THEN 2 WHEN 'PENDING' THEN 1 ELSE 0 END DESC,
+                     (interview_date IS NOT NULL OR coalesce(interview_scheduled, false)) DESC,
+                     id
+          ) AS rn
+          FROM job_applications
+        ), deleted AS (
+          DELETE FROM job_applications a USING ranked WHERE a.id = ranked.id AND ranked.rn > 1 RETURNING a.id
+        )
+        SELECT count(*) FROM deleted""",
+    # registered_count is recomputed for the affected events from the rows that remain
+    "uq_event_registrations_event_id_user_id": """
+        WITH ranked AS (
+          SELECT id, event_id, registration_status, row_number() OVER (
+            PARTITION BY event_id, user_id
+            ORDER BY CASE registration_status
+                       WHEN 'attended' THEN 3 WHEN 'registered' THEN 2 WHEN 'waitlisted' THEN 1 ELSE 0 END DESC,
+                     id
+          ) AS rn
+          FROM event_registrations
+        ), deleted AS (
+          DELETE FROM event_registrations r USING ranked WHERE r.id = ranked.id AND ranked.rn > 1 RETURNING r.event_id
+        ), recounted AS (
+          UPDATE events e SET registered_count = (
+            SELECT count(*) FROM ranked k
+            WHERE k.event_id = e.id AND k.rn = 1 AND k.registration_status IN ('registered', 'attended')
+          )
+          WHERE e.id IN (SELECT event_id FROM deleted)
+        )
+        SELECT count(*) FROM deleted""",
+}
+
+def dedupe_before_unique_indexes(conn) -> None:
+    for index, sql in DEDUPE_BEFORE_UNIQUE_INDEX.items():
+        try:
+            if conn.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {"name": index}).first():
+                continue
+            removed = conn.execute(text(sql)).scalar()
+            conn.commit()
+            if removed:
+                print(f"Startup: removed {removed} duplicate row(s) so {index} can be built (kept the most advanced row of each duplicate set)")
+        except Exception as e:
+            conn.rollback()
+            print(f"Startup warning: could not remove duplicates for {index}; it will not be built until they are cleaned up: {e}")
+
 def create_tables():
     try:
         Base.metadata.create_all(bind=engine)
@@ -65,6 +157,15 @@ def create_tables():
             except Exception as e:
                 conn.rollback()
                 print(f"Note: Could not add alternate_email column (may already exist): {e}")
+            dedupe_before_unique_indexes(conn)
+            # create_all does not add indexes (or our triggers) to tables that already exist
+            for ddl in INDEX_DDL:
+                try:
+                    conn.execute(text(ddl))
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Note: Could not create index ({ddl.strip()}): {e}")
     except Exception as e:
         print(f"Startup warning: create_tables failed: {e}")
 
@@ -73,8 +174,25 @@ async def lifespan(app: FastAPI):
     # Startup
     ensure_db_types()
     create_tables()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.add("close_expired_jobs", settings.JOB_EXPIRY_INTERVAL_SECONDS, close_expired_jobs)
+        scheduler.add("send_event_reminders", settings.EVENT_REMINDER_INTERVAL_SECONDS, send_event_reminders)
+        scheduler.add("apply_notification_retention", settings.NOTIFICATION_RETENTION_INTERVAL_SECONDS, apply_notification_retention)
+        scheduler.add("send_notification_digests", settings.NOTIFICATION_DIGEST_INTERVAL_SECONDS, send_notification_digests)
+        scheduler.add("purge_expired_idempotency_keys", 3600, purge_expired_idempotency_keys)
+        scheduler.add("purge_sent_emails", settings.EMAIL_RETENTION_INTERVAL_SECONDS, purge_sent_emails)
+        scheduler.start()
+    if settings.SMTP_HOST and not smtp_configured():
+        print("Startup warning: SMTP_HOST is set but neither SMTP_FROM nor SMTP_USER is; SMTP sending is disabled")
+    if settings.EMAIL_OUTBOX_WORKERS > 0:
+        email_outbox_pool.start(settings.EMAIL_OUTBOX_WORKERS)
+    notification_hub.start()
     yield
     # Shutdown
+    await notification_hub.stop()
+    await scheduler.stop()
+    await email_outbox_pool.stop()
+    await asyncio.to_thread(shutdown_storage_io)
     engine.dispose()
 
 app = FastAPI(
@@ -91,6 +209,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
@@ -0,0 +1,120 @@
+"""Check-ins per second through the single and batched event check-in endpoints.
+
+Run against a live backend (python -m uvicorn main:app in backend/) and the
+same database it uses:
+
+    API_URL=http://localhost:8000 DATABASE_URL=postgresql://... python check_event_checkin_throughput.py
+
+It creates throwaway users registered for one event, then times:
+  1. SINGLE_SCANS scans sent one at a time to POST /events/{id}/check-in;
+  2. the remaining scans sent in batches of BATCH_SIZE to .../check-in/batch.
+It checks every scan comes back checked_in, every registration ends up
+attended, a repeated batch reports already_checked_in, and that batched
+check-ins reach MIN_SCANS_PER_SECOND (default 1000). Exits non-zero on the
+first failed check.
+"""
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+API_URL = os.environ.get("API_URL", "http://localhost:8000").rstrip("/") + "/api/v1"
+DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql://postgres@localhost:5432/prepsphere")
+STUDENTS = int(os.environ.get("STUDENTS", "3000"))
+SINGLE_SCANS = 300
+BATCH_SIZE = 200
+MIN_SCANS_PER_SECOND = float(os.environ.get("MIN_SCANS_PER_SECOND", "1000"))
+THREADS = 32
+
+def call(method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(API_URL + path, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "replace")
+
+def check(ok, message):
+    print(("PASS " if ok else "FAIL ") + message)
+    if not ok:
+        sys.exit(1)
+
+def create_users(n, tag):
+    def one(i):
+        status, body = call("POST", "/users/", {
+            "clerkUserId": f"checkin_{tag}_{i}",
+            "email": f"checkin.{tag}.{i}@example.com",
+            "firstName": "Scan",
+            "lastName": str(i),
+        })
+        if status != 200:
+            raise RuntimeError(f"creating user {i} failed: {status} {body}")
+        return body["id"]
+    with ThreadPoolExecutor(THREADS) as pool:
+        return list(pool.map(one, range(n)))
+
+def main():
+    tag = str(int(time.time()))
+    users = create_users(STUDENTS, tag)
+    status, event = call("POST", "/events/", {
+        "title": f"Check-in benchmark {tag}",
+        "description": "Created by check_event_checkin_throughput.py",
+        "location": "Main hall",
+        "event_date": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+        "event_time": "10:00 AM",
+        "created_by": users[0],
+    })
+    check(status == 200, f"event created ({status})")
+    # POST /events/ echoes the request without the new id
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute("SELECT id FROM events WHERE title = %s", (event["title"],))
+        event_id = cur.fetchone()[0]
+    call("PUT", f"/events/{event_id}", {"capacity": STUDENTS})
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = list(pool.map(lambda u: call("POST", f"/events/{event_id}/register", {"user_id": u})[0], users))
+    check(statuses.count(200) == STUDENTS, f"{STUDENTS} students registered")
+
+    # 1. One scan per request, as a single door scanner would send them
+    single, batched = users[:SINGLE_SCANS], users[SINGLE_SCANS:]
+    started = time.perf_counter()
+    results = [call("POST", f"/events/{event_id}/check-in", {"user_id": u})[1] for u in single]
+    single_rate = len(single) / (time.perf_counter() - started)
+    check(all(r["status"] == "checked_in" for r in results), f"{len(single)} single scans checked in")
+
+    # 2. Batches, as an offline scanner catching up would upload them
+    started = time.perf_counter()
+    results = []
+    for i in range(0, len(batched), BATCH_SIZE):
+        scans = [{"user_id": u} for u in batched[i:i + BATCH_SIZE]]
+        status, body = call("POST", f"/events/{event_id}/check-in/batch", {"scans": scans})
+        if status != 200:
+            check(False, f"batch {i // BATCH_SIZE + 1} rejected: {status} {body}")
+        results.extend(body)
+    batch_rate = len(batched) / (time.perf_counter() - started)
+    check(len(results) == len(batched) and all(r["status"] == "checked_in" for r in results),
+          f"{len(batched)} batched scans checked in")
+
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT count(*) FROM event_registrations WHERE event_id = %s AND registration_status = 'attended' AND attended_at IS NOT NULL",
+            (event_id,),
+        )
+        attended = cur.fetchone()[0]
+    check(attended == STUDENTS, f"{attended} of {STUDENTS} registrations marked attended")
+    status, body = call("POST", f"/events/{event_id}/check-in/batch", {"scans": [{"user_id": u} for u in users[:BATCH_SIZE]]})
+    check(status == 200 and all(r["status"] == "already_checked_in" for r in body), "repeated scans report already_checked_in")
+
+    print(f"     single endpoint: {single_rate:.0f} scans/s")
+    print(f"     batch endpoint ({BATCH_SIZE} per request): {batch_rate:.0f} scans/s")
+    check(batch_rate >= MIN_SCANS_PER_SECOND, f"batched check-ins reach {MIN_SCANS_PER_SECOND:.0f} scans/s")
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
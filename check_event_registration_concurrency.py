@@ -0,0 +1,125 @@
+"""Concurrency check for event registration, waitlist and cancellation.
+
+Run against a live backend (python -m uvicorn main:app in backend/) and the
+same database it uses:
+
+    API_URL=http://localhost:8000 DATABASE_URL=postgresql://... python check_event_registration_concurrency.py
+
+It creates throwaway users and an event, then:
+  1. fires 340 parallel registrations at a 50-seat event and checks that
+     exactly 50 succeed, registered_count is 50 and 50 rows are registered;
+  2. fires parallel waitlist joins mixed with cancellations and checks that
+     no seat is left empty while anyone is still waiting;
+  3. raises the capacity and checks the new seats go to the waitlist.
+Exits non-zero on the first failed check.
+"""
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+API_URL = os.environ.get("API_URL", "http://localhost:8000").rstrip("/") + "/api/v1"
+DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql://postgres@localhost:5432/prepsphere")
+CAPACITY = 50
+REGISTRATIONS = 340
+WAITLIST_JOINS = 120
+CANCELLATIONS = 30
+THREADS = 64
+
+def call(method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(API_URL + path, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "replace")
+
+def check(ok, message):
+    print(("PASS " if ok else "FAIL ") + message)
+    if not ok:
+        sys.exit(1)
+
+def create_users(n, tag):
+    def one(i):
+        status, body = call("POST", "/users/", {
+            "clerkUserId": f"concurrency_{tag}_{i}",
+            "email": f"concurrency.{tag}.{i}@example.com",
+            "firstName": "Load",
+            "lastName": str(i),
+        })
+        if status != 200:
+            raise RuntimeError(f"creating user {i} failed: {status} {body}")
+        return body["id"]
+    with ThreadPoolExecutor(THREADS) as pool:
+        return list(pool.map(one, range(n)))
+
+def seat_state(event_id):
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute("SELECT registered_count, capacity FROM events WHERE id = %s", (event_id,))
+        registered_count, capacity = cur.fetchone()
+        cur.execute(
+            "SELECT registration_status, count(*) FROM event_registrations WHERE event_id = %s GROUP BY 1",
+            (event_id,),
+        )
+        rows = dict(cur.fetchall())
+    return registered_count, capacity, rows
+
+def main():
+    tag = str(int(time.time()))
+    users = create_users(REGISTRATIONS + WAITLIST_JOINS, tag)
+    status, event = call("POST", "/events/", {
+        "title": f"Concurrency check {tag}",
+        "description": "Created by check_event_registration_concurrency.py",
+        "location": "Main hall",
+        "event_date": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
+        "event_time": "10:00 AM",
+        "created_by": users[0],
+    })
+    check(status == 200, f"event created ({status})")
+    # POST /events/ echoes the request without the new id
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute("SELECT id FROM events WHERE title = %s", (event["title"],))
+        event_id = cur.fetchone()[0]
+    status, _ = call("PUT", f"/events/{event_id}", {"capacity": CAPACITY})
+    check(status == 200, f"capacity set to {CAPACITY}")
+
+    # 1. Registration storm
+    registrants = users[:REGISTRATIONS]
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = list(pool.map(lambda u: call("POST", f"/events/{event_id}/register", {"user_id": u})[0], registrants))
+    registered_count, capacity, rows = seat_state(event_id)
+    check(statuses.count(200) == CAPACITY, f"{statuses.count(200)} of {REGISTRATIONS} registrations succeeded")
+    check(statuses.count(409) == REGISTRATIONS - CAPACITY, f"{statuses.count(409)} were turned away as full")
+    check(registered_count <= capacity, f"registered_count {registered_count} <= capacity {capacity}")
+    check(rows.get("registered", 0) == capacity, f"{rows.get('registered', 0)} registered rows == capacity {capacity}")
+
+    # 2. Waitlist joins racing cancellations
+    seated = [u for u, s in zip(registrants, statuses) if s == 200]
+    jobs = [("POST", f"/events/{event_id}/waitlist", u) for u in users[REGISTRATIONS:]]
+    jobs += [("POST", f"/events/{event_id}/cancel", u) for u in seated[:CANCELLATIONS]]
+    jobs.sort(key=lambda job: hash((job[2], tag)))
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = list(pool.map(lambda job: call(job[0], job[1], {"user_id": job[2]})[0], jobs))
+    check(all(s == 200 for s in statuses), "every waitlist join and cancellation succeeded")
+    registered_count, capacity, rows = seat_state(event_id)
+    registered, waiting = rows.get("registered", 0), rows.get("waitlisted", 0)
+    check(registered_count == registered, f"registered_count {registered_count} matches {registered} registered rows")
+    check(registered <= capacity, f"{registered} registered <= capacity {capacity}")
+    check(waiting == 0 or registered == capacity, f"no empty seat while {waiting} students wait ({registered}/{capacity} taken)")
+
+    # 3. Raising capacity hands the new seats to the queue
+    status, _ = call("PUT", f"/events/{event_id}", {"capacity": CAPACITY + 20})
+    registered_count, capacity, rows = seat_state(event_id)
+    expected = min(capacity, registered + waiting)
+    check(rows.get("registered", 0) == expected == registered_count, f"capacity increase promoted waiters ({registered_count}/{capacity} taken)")
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Cross-worker check for the job expiry sweep and the job feed cache.
+
+Run against a live multi-worker backend (e.g. gunicorn -w 4 ... in backend/)
+with the same database, and the same CACHE_URL if the backend uses one:
+
+    API_URL=http://localhost:8000 DATABASE_URL=postgresql://... python check_job_expiry_invalidation.py
+
+It creates a throwaway job and polls /jobs/ until every worker has served and
+cached it, then backdates the deadline and runs the expiry sweep in this
+process, i.e. on none of the server's workers. Every worker must then stop
+listing the job and must not answer the ETags it handed out earlier with 304.
+Exits non-zero on the first failed check.
+"""
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+API_URL = os.environ.get("API_URL", "http://localhost:8000").rstrip("/") + "/api/v1"
+DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql://postgres@localhost:5432/prepsphere")
+POLLS = 40  # enough requests to reach every worker behind the load balancer
+
+# The sweep below runs the backend's own code against the same database
+os.environ["DATABASE_URL"] = DATABASE_URL
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+def call(method, path, body=None, etag=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"}
+    if etag:
+        headers["If-None-Match"] = etag
+    req = urllib.request.Request(API_URL + path, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, resp.headers.get("ETag"), json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("ETag"), None
+
+def check(ok, message):
+    print(("PASS " if ok else "FAIL ") + message)
+    if not ok:
+        sys.exit(1)
+
+def main():
+    tag = str(int(time.time()))
+    status, _, user = call("POST", "/users/", {
+        "clerkUserId": f"expiry_{tag}",
+        "email": f"expiry.{tag}@example.com",
+        "firstName": "Expiry",
+        "lastName": "Check",
+    })
+    check(status == 200, f"user created ({status})")
+    status, _, job = call("POST", "/jobs/", {
+        "title": f"Expiry check {tag}",
+        "company": "PrepSphere",
+        "location": "Remote",
+        "description": "Created by check_job_expiry_invalidation.py",
+        "requirements": "None",
+        "application_deadline": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "created_by": user["id"],
+    })
+    check(status == 200, f"job {job and job.get('id')} created ({status})")
+
+    etags = set()
+    for _ in range(POLLS):
+        status, etag, jobs = call("GET", "/jobs/")
+        check(status == 200 and any(j["id"] == job["id"] for j in jobs), "open job is listed")
+        etags.add(etag)
+    check(None not in etags, f"feed served with ETags ({len(etags)} distinct)")
+
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute("UPDATE jobs SET application_deadline = now() - interval '1 minute' WHERE id = %s", (job["id"],))
+    from app.tasks.job_expiry import close_expired_jobs
+    closed = close_expired_jobs()
+    with psycopg2.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute("SELECT is_active FROM jobs WHERE id = %s", (job["id"],))
+        is_active = cur.fetchone()[0]
+    check(not is_active, f"sweep in this process closed the job ({closed} closed here)")
+
+    for i in range(POLLS):
+        etag = sorted(etags)[i % len(etags)]
+        status, _, jobs = call("GET", "/jobs/", etag=etag)
+        check(status == 200, f"stale ETag {etag} not answered with 304 ({status})")
+        check(all(j["id"] != job["id"] for j in jobs), "expired job no longer listed")
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
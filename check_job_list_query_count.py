@@ -0,0 +1,104 @@
+"""Query-count benchmark for the job listings (GET /jobs/ and GET /jobs/tpo/jobs).
+
+Runs the backend in-process against a scratch database and counts the SQL
+statements each listing request executes:
+
+    DATABASE_URL=postgresql://... python check_job_list_query_count.py
+
+For pages of 1 and 100 jobs (each job with a few applications) it asserts the
+statement count is the same, i.e. applicant counts are not fetched per job,
+and that the counts returned are right. It creates its own tagged users, jobs
+and applications and deletes them again afterwards. Exits non-zero on the
+first failed check.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main as backend
+from app.core.cache import job_feed_cache
+from app.db.session import SessionLocal, engine
+from app.models import Job, JobApplication, User, UserRole
+
+PAGE_SIZES = (1, 100)
+APPLICANTS_PER_JOB = 3
+
+statements = []
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+def check(ok, message):
+    print(("PASS " if ok else "FAIL ") + message)
+    if not ok:
+        sys.exit(1)
+
+def seed(db, tag, n_jobs):
+    students = [
+        User(clerk_user_id=f"qc_{tag}_{i}", email=f"qc.{tag}.{i}@example.com", first_name="Query",
+             last_name=str(i), role=UserRole.STUDENT)
+        for i in range(APPLICANTS_PER_JOB)
+    ]
+    db.add_all(students)
+    db.commit()
+    jobs = [
+        Job(title=f"Query count {i}", company=f"qc-{tag}", location="Remote", description="Created by check_job_list_query_count.py",
+            requirements="None", created_by=students[0].id)
+        for i in range(n_jobs)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    db.add_all([JobApplication(job_id=j.id, user_id=s.id) for j in jobs for s in students])
+    db.commit()
+    return students, jobs
+
+def measure(client, path, params):
+    job_feed_cache.bump()  # make the feed a cache miss so the listing query really runs
+    statements.clear()
+    started = time.perf_counter()
+    resp = client.get(path, params=params)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return resp, len(statements), elapsed_ms
+
+def main():
+    backend.ensure_db_types()
+    backend.create_tables()
+    client = TestClient(backend.app)  # not entered as a context manager: no scheduler or workers
+    counts = {}
+    for n in PAGE_SIZES:
+        tag = f"{int(time.time())}_{n}"
+        db = SessionLocal()
+        students, jobs = seed(db, tag, n)
+        try:
+            ids = {j.id for j in jobs}
+            for name, path, params in (
+                ("/jobs/", "/api/v1/jobs/", {"company": f"qc-{tag}", "limit": n}),
+                ("/jobs/tpo/jobs", "/api/v1/jobs/tpo/jobs", {"limit": n}),
+            ):
+                resp, count, elapsed_ms = measure(client, path, params)
+                check(resp.status_code == 200, f"{name} with {n} jobs answered 200")
+                rows = [r for r in resp.json() if r["id"] in ids]
+                check(len(rows) == n, f"{name} returned all {n} jobs")
+                check(all(r["applicants"] == APPLICANTS_PER_JOB for r in rows), f"{name} applicant counts are correct")
+                print(f"     {name}: {n} jobs -> {count} statements, {elapsed_ms:.1f} ms")
+                counts[(name, n)] = count
+        finally:
+            db.query(JobApplication).filter(JobApplication.job_id.in_([j.id for j in jobs])).delete(synchronize_session=False)
+            db.query(Job).filter(Job.id.in_([j.id for j in jobs])).delete(synchronize_session=False)
+            db.query(User).filter(User.id.in_([s.id for s in students])).delete(synchronize_session=False)
+            db.commit()
+            db.close()
+            job_feed_cache.bump()
+    for name in ("/jobs/", "/jobs/tpo/jobs"):
+        small, large = (counts[(name, n)] for n in PAGE_SIZES)
+        check(small == large, f"{name} statement count is constant ({small} for {PAGE_SIZES[0]} job, {large} for {PAGE_SIZES[1]} jobs)")
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Presign benchmark and round-trip check for the shared object-storage client.
+
+Uses the backend's own R2 settings (R2_ENDPOINT, R2_ACCESS_KEY_ID,
+R2_SECRET_ACCESS_KEY, R2_BUCKET_NAME from the environment or backend/.env);
+when they are not set it prints SKIP and exits 0:
+
+    R2_ENDPOINT=https://... R2_ACCESS_KEY_ID=... R2_SECRET_ACCESS_KEY=... R2_BUCKET_NAME=... python check_storage_client.py
+
+  1. Presigns per second with a client built for every call (what get_s3()
+     used to do) against the shared client; the shared client must be at
+     least MIN_SPEEDUP (default 5) times faster. Presigning needs no network.
+  2. Presigns from many threads at once through the shared client.
+  3. A real round trip through the upload-ticket path in files.py: PUT a
+     file to a presigned URL, confirm it, and check that a body of a
+     different size is refused by storage. The test objects are deleted.
+Exits non-zero on the first failed check.
+"""
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.core.config import settings
+from app.core.storage import _build_client, get_storage_client, storage_configured
+
+FRESH_CLIENT_PRESIGNS = 50
+SHARED_CLIENT_PRESIGNS = 3000
+THREADS = 16
+MIN_SPEEDUP = float(os.environ.get("MIN_SPEEDUP", "5"))
+USER_ID = int(os.environ.get("CHECK_USER_ID", "0"))  # owner of the throwaway test objects
+
+def check(ok, message):
+    print(("PASS " if ok else "FAIL ") + message)
+    if not ok:
+        sys.exit(1)
+
+def presign(client, i):
+    return client.generate_presigned_url(
+        "put_object",
+        Params={"Bucket": settings.R2_BUCKET_NAME, "Key": f"check/{i}.pdf", "ContentType": "application/pdf", "ContentLength": 1024},
+        ExpiresIn=600,
+    )
+
+def rate(n, func):
+    started = time.perf_counter()
+    for i in range(n):
+        func(i)
+    return n / (time.perf_counter() - started)
+
+def put(url, headers, body):
+    req = urllib.request.Request(url, data=body, method="PUT", headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def main():
+    if not storage_configured():
+        print("SKIP object storage is not configured (set R2_ENDPOINT, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_BUCKET_NAME)")
+        return
+
+    # 1. Presigns per second, before and after sharing the client
+    fresh_rate = rate(FRESH_CLIENT_PRESIGNS, lambda i: presign(_build_client(), i))
+    shared = get_storage_client()
+    presign(shared, 0)  # first use builds the client
+    shared_rate = rate(SHARED_CLIENT_PRESIGNS, lambda i: presign(shared, i))
+    print(f"     client per call: {fresh_rate:.0f} presigns/s")
+    print(f"     shared client:   {shared_rate:.0f} presigns/s")
+    check(shared_rate >= MIN_SPEEDUP * fresh_rate, f"shared client is at least {MIN_SPEEDUP:g}x faster ({shared_rate / fresh_rate:.1f}x)")
+
+    # 2. The shared client from many threads at once
+    with ThreadPoolExecutor(THREADS) as pool:
+        urls = list(pool.map(lambda i: presign(get_storage_client(), i), range(SHARED_CLIENT_PRESIGNS)))
+    check(len(set(urls)) == len(urls) and all("X-Amz-Signature=" in u for u in urls),
+          f"{len(urls)} presigns from {THREADS} threads all signed")
+
+    # 3. Round trip through the upload-ticket path
+    from fastapi import HTTPException
+    from app.api.v1.files import _confirm_upload, _upload_ticket
+    from app.schemas.file import UploadTicketRequest
+
+    body = b"%PDF-1.4\n" + b"0" * 2048
+    keys = []
+    try:
+        ticket = _upload_ticket("resume", UploadTicketRequest(user_id=USER_ID, filename="check.pdf", content_type="application/pdf", size=len(body)))
+        keys.append(ticket.key)
+        status = put(ticket.url, ticket.headers, body)
+        check(status == 200, f"presigned PUT of {len(body)} bytes accepted ({status})")
+        public_url = _confirm_upload("resume", USER_ID, ticket.key)
+        check(public_url.endswith(ticket.key), "upload confirmed")
+        head = shared.head_object(Bucket=settings.R2_BUCKET_NAME, Key=ticket.key)
+        check(head["ContentLength"] == len(body) and head["ContentType"] == "application/pdf", "stored object has the signed type and size")
+
+        ticket = _upload_ticket("resume", UploadTicketRequest(user_id=USER_ID, filename="check.pdf", content_type="application/pdf", size=len(body)))
+        keys.append(ticket.key)
+        status = put(ticket.url, ticket.headers, body + b"extra")
+        check(status in (400, 403), f"PUT of a different size refused by storage ({status})")
+        try:
+            _confirm_upload("resume", USER_ID, ticket.key)
+            check(False, "confirming a refused upload fails")
+        except HTTPException as e:
+            check(e.status_code == 400, f"confirming a refused upload fails ({e.detail})")
+    finally:
+        for key in keys:
+            try:
+                shared.delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+            except Exception:
+                pass
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Load test: unrelated endpoints stay responsive while uploads are in flight.
+
+Run against a live backend whose object storage is configured (R2 or any S3
+endpoint); without it the script prints SKIP and exits 0:
+
+    API_URL=http://localhost:8000 python check_upload_load.py
+
+It probes GET /health (no I/O) and GET /api/v1/notifications/unread-count/{id}
+(one database query) back to back for DURATION seconds, first on an idle
+server and then while UPLOADERS clients keep posting UPLOAD_KB files to
+POST /api/v1/files/resumes, and reports p50/p99 for each. It passes when
+every probe p99 under load stays within MAX_P99_MS (default 250ms) and
+uploads went through (a 503 "storage busy" counts as handled, not failed).
+Exits non-zero on the first failed check.
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+API_URL = os.environ.get("API_URL", "http://localhost:8000").rstrip("/")
+DURATION = float(os.environ.get("DURATION", "10"))
+UPLOADERS = int(os.environ.get("UPLOADERS", "8"))
+UPLOAD_KB = int(os.environ.get("UPLOAD_KB", "200"))
+MAX_P99_MS = float(os.environ.get("MAX_P99_MS", "250"))
+
+def check(ok, message):
+    print(("PASS " if ok else "FAIL ") + message)
+    if not ok:
+        sys.exit(1)
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+async def probe(client, path, stop):
+    # One request at a time per endpoint, so a stalled event loop shows up as
+    # latency rather than as a pile of queued requests
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        resp = await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        resp.raise_for_status()
+    return latencies
+
+async def uploader(client, user_id, stop, outcomes):
+    body = b"%PDF-1.4\n" + os.urandom(UPLOAD_KB * 1024)
+    while not stop.is_set():
+        resp = await client.post(
+            "/api/v1/files/resumes",
+            data={"user_id": str(user_id)},
+            files={"file": ("load.pdf", body, "application/pdf")},
+        )
+        outcomes.append(resp.status_code)
+
+async def run_window(client, probes, user_id=None):
+    stop = asyncio.Event()
+    outcomes = []
+    tasks = [asyncio.create_task(probe(client, path, stop)) for path in probes]
+    uploads = [asyncio.create_task(uploader(client, user_id, stop, outcomes)) for _ in range(UPLOADERS if user_id else 0)]
+    await asyncio.sleep(DURATION)
+    stop.set()
+    results = await asyncio.gather(*tasks)
+    await asyncio.gather(*uploads)
+    return dict(zip(probes, results)), outcomes
+
+def report(label, results):
+    for path, latencies in results.items():
+        print(f"     {label:>12} {path}: {len(latencies)} probes, p50 {percentile(latencies, 0.5):.0f}ms, p99 {percentile(latencies, 0.99):.0f}ms")
+
+async def main():
+    limits = httpx.Limits(max_connections=UPLOADERS + 8)
+    async with httpx.AsyncClient(base_url=API_URL, timeout=120, limits=limits) as client:
+        tag = str(int(time.time()))
+        resp = await client.post("/api/v1/users/", json={
+            "clerkUserId": f"load_{tag}", "email": f"load.{tag}@example.com", "firstName": "Load", "lastName": "Test",
+        })
+        check(resp.status_code == 200, f"user created ({resp.status_code})")
+        user_id = resp.json()["id"]
+
+        resp = await client.post(
+            "/api/v1/files/resumes",
+            data={"user_id": str(user_id)},
+            files={"file": ("load.pdf", b"%PDF-1.4\n", "application/pdf")},
+        )
+        if resp.status_code == 500 and "not configured" in resp.text:
+            print("SKIP object storage is not configured on the server")
+            return
+        check(resp.status_code == 200, f"a single upload works ({resp.status_code})")
+
+        probes = ["/health", f"/api/v1/notifications/unread-count/{user_id}"]
+        idle, _ = await run_window(client, probes)
+        report("idle", idle)
+        loaded, outcomes = await run_window(client, probes, user_id)
+        report(f"{UPLOADERS} uploaders", loaded)
+        ok, busy = outcomes.count(200), outcomes.count(503)
+        print(f"     uploads: {ok} stored, {busy} turned away busy, {len(outcomes) - ok - busy} failed")
+        check(ok > 0 and ok + busy == len(outcomes), "uploads were stored or turned away with 503")
+        for path, latencies in loaded.items():
+            p99 = percentile(latencies, 0.99)
+            check(p99 <= MAX_P99_MS, f"{path} p99 {p99:.0f}ms under load <= {MAX_P99_MS:.0f}ms")
+    print("All checks passed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
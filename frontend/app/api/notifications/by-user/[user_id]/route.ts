@@ -1,4 +1,5 @@
 import { NextResponse } from 'next/server'
+import { fetchAllPages } from '@/lib/pagination'
 export const runtime = 'nodejs'
 export const dynamic = 'force-dynamic'
 
@@ -6,10 +7,12 @@ export async function GET(_: Request, { params }: any) {
   try {
     const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'https://project-2-payz.onrender.com'
     // Try Node backend route first
-    let res = await fetch(`${API_BASE}/api/v1/users/${encodeURIComponent(params.user_id)}/notifications?t=${Date.now()}`, { cache:'no-store' })
+    const res = await fetch(`${API_BASE}/api/v1/users/${encodeURIComponent(params.user_id)}/notifications?t=${Date.now()}`, { cache:'no-store' })
     if (!res.ok) {
-      // Fallback to FastAPI
-      res = await fetch(`${API_BASE}/api/v1/notifications/by-user/${encodeURIComponent(params.user_id)}?t=${Date.now()}`, { cache:'no-store' })
+      // Fallback to FastAPI, which pages its results; follow every page
+      const rows = await fetchAllPages(`${API_BASE}/api/v1/notifications/by-user/${encodeURIComponent(params.user_id)}?t=${Date.now()}`, { cache:'no-store' })
+      if (!rows) return NextResponse.json({ error: 'Failed to load notifications' }, { status: 502 })
+      return NextResponse.json(rows)
     }
     const text = await res.text()
     return new NextResponse(text, { status: res.status, headers: { 'Content-Type': res.headers.get('Content-Type') || 'application/json' } })
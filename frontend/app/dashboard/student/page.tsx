@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react'
 import { Button } from '@/components/ui/button'
 import LogoutButton from '@/components/LogoutButton'
+import { fetchAllPages } from '@/lib/pagination'
 import { useUser } from '@clerk/nextjs'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
@@ -187,15 +188,13 @@ export default function StudentDashboard() {
           return
         }
 
-        const jobsResponse = await fetch(`${API_BASE}/api/v1/jobs`)
-        if (jobsResponse.ok) {
-          const jobsData = await jobsResponse.json()
+        const jobsData = await fetchAllPages(`${API_BASE}/api/v1/jobs`)
+        if (jobsData) {
           setJobListings(jobsData)
         }
 
-        const eventsResponse = await fetch(`${API_BASE}/api/v1/events`)
-        if (eventsResponse.ok) {
-          const eventsData = await eventsResponse.json()
+        const eventsData = await fetchAllPages(`${API_BASE}/api/v1/events`)
+        if (eventsData) {
           setEvents(eventsData)
         }
 
@@ -235,9 +234,8 @@ export default function StudentDashboard() {
     const refreshJobs = async () => {
       try {
         if (activeTab === 'jobs') {
-          const res = await fetch(`${API_BASE}/api/v1/jobs`)
-          if (res.ok) {
-            const rows = await res.json()
+          const rows = await fetchAllPages(`${API_BASE}/api/v1/jobs`)
+          if (rows) {
             setJobListings(rows)
           }
         }
@@ -250,9 +248,8 @@ export default function StudentDashboard() {
     const refreshEvents = async () => {
       try {
         if (activeTab === 'events') {
-          const res = await fetch(`${API_BASE}/api/v1/events`)
-          if (res.ok) {
-            const rows = await res.json()
+          const rows = await fetchAllPages(`${API_BASE}/api/v1/events`)
+          if (rows) {
             setEvents(rows)
           }
         }
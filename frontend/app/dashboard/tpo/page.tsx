@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react'
 import { Button } from '@/components/ui/button'
 import LogoutButton from '@/components/LogoutButton'
+import { fetchAllPages } from '@/lib/pagination'
 import { useUser } from '@clerk/nextjs'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
@@ -142,15 +143,13 @@ export default function TPODashboard() {
         const rows = await aps.json()
         setApprovedStudents(rows)
       }
-      const tj = await fetch(`${API_BASE_DEFAULT}/api/v1/jobs`)
-      if (tj.ok) {
-        const jobsRows = await tj.json()
+      const jobsRows = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/jobs`)
+      if (jobsRows) {
         setJobs(jobsRows)
       }
-      const evs = await fetch(`${API_BASE_DEFAULT}/api/v1/events${eventFilter==='All'?'':`?status=${encodeURIComponent(eventFilter)}`}`)
-      if (evs.ok) {
-        const rows = await evs.json()
-        setTpoEvents(rows)
+      const eventRows = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/events${eventFilter==='All'?'':`?status=${encodeURIComponent(eventFilter)}`}`)
+      if (eventRows) {
+        setTpoEvents(eventRows)
       }
     } catch {}
   }
@@ -218,8 +217,8 @@ export default function TPODashboard() {
       const row = await res.json()
       setTpoEvents(prev => [row, ...prev])
       try {
-        const evs = await fetch(`${API_BASE_DEFAULT}/api/v1/events`)
-        if (evs.ok) setTpoEvents(await evs.json())
+        const evs = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/events`)
+        if (evs) setTpoEvents(evs)
       } catch {}
       setIsCreatingEvent(false)
       setEventForm({ title:'', description:'', location:'', date:'', time:'', form_url:'', category:'' })
@@ -250,8 +249,8 @@ export default function TPODashboard() {
     const refreshApplicants = async () => {
       try {
         if (openApplicantsJobId) {
-          const res = await fetch(`${API_BASE_DEFAULT}/api/v1/jobs/${openApplicantsJobId}/applications`)
-          if (res.ok) setApplicants(await res.json())
+          const rows = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/jobs/${openApplicantsJobId}/applications`)
+          if (rows) setApplicants(rows)
         }
       } catch {}
     }
@@ -272,8 +271,8 @@ export default function TPODashboard() {
     const refreshJobs = async () => {
       try {
         if (activeTab === 'jobs') {
-          const tj = await fetch(`${API_BASE_DEFAULT}/api/v1/tpo/jobs`)
-          if (tj.ok) setJobs(await tj.json())
+          const tj = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/tpo/jobs`)
+          if (tj) setJobs(tj)
         }
       } catch {}
     }
@@ -920,9 +919,8 @@ export default function TPODashboard() {
                               <Button variant="outline" onClick={async()=>{
                                 try {
                                   if (openApplicantsJobId === job.id) { setOpenApplicantsJobId(null); setApplicants([]); return }
-                                  const res = await fetch(`${API_BASE_DEFAULT}/api/v1/jobs/${job.id}/applications`)
-                                  if (res.ok) {
-                                    const rows = await res.json()
+                                  const rows = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/jobs/${job.id}/applications`)
+                                  if (rows) {
                                     setApplicants(rows)
                                     setOpenApplicantsJobId(job.id)
                                   }
@@ -934,8 +932,8 @@ export default function TPODashboard() {
                               {openApplicantsJobId === job.id && (
                                 <Button variant="outline" onClick={async()=>{
                                   try {
-                                    const res = await fetch(`${API_BASE_DEFAULT}/api/v1/jobs/${job.id}/applications`)
-                                    if (res.ok) setApplicants(await res.json())
+                                    const rows = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/jobs/${job.id}/applications`)
+                                    if (rows) setApplicants(rows)
                                   } catch {}
                                 }}>Refresh</Button>
                               )}
@@ -1034,9 +1032,8 @@ export default function TPODashboard() {
                               <Button variant="outline" onClick={async()=>{
                                 try {
                                   if (openApplicantsJobId === job.id) { setOpenApplicantsJobId(null); setApplicants([]); return }
-                                  const res = await fetch(`${API_BASE_DEFAULT}/api/v1/jobs/${job.id}/applications`)
-                                  if (res.ok) {
-                                    const rows = await res.json()
+                                  const rows = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/jobs/${job.id}/applications`)
+                                  if (rows) {
                                     setApplicants(rows)
                                     setOpenApplicantsJobId(job.id)
                                   }
@@ -1081,10 +1078,10 @@ export default function TPODashboard() {
                   </Button>
                 </div>
                 <div className="flex gap-2 mb-4">
-                  <Button variant={eventFilter==='Upcoming'?'default':'outline'} onClick={async()=>{ setEventFilter('Upcoming'); const evs = await fetch(`${API_BASE_DEFAULT}/api/v1/events?status=Upcoming`); if (evs.ok) setTpoEvents(await evs.json()) }}>Upcoming</Button>
-                  <Button variant={eventFilter==='Completed'?'default':'outline'} onClick={async()=>{ setEventFilter('Completed'); const evs = await fetch(`${API_BASE_DEFAULT}/api/v1/events?status=Completed`); if (evs.ok) setTpoEvents(await evs.json()) }}>Completed</Button>
-                  <Button variant={eventFilter==='Cancelled'?'default':'outline'} onClick={async()=>{ setEventFilter('Cancelled'); const evs = await fetch(`${API_BASE_DEFAULT}/api/v1/events?status=Cancelled`); if (evs.ok) setTpoEvents(await evs.json()) }}>Cancelled</Button>
-                  <Button variant={eventFilter==='All'?'default':'outline'} onClick={async()=>{ setEventFilter('All'); const evs = await fetch(`${API_BASE_DEFAULT}/api/v1/events`); if (evs.ok) setTpoEvents(await evs.json()) }}>All</Button>
+                  <Button variant={eventFilter==='Upcoming'?'default':'outline'} onClick={async()=>{ setEventFilter('Upcoming'); const evs = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/events?status=Upcoming`); if (evs) setTpoEvents(evs) }}>Upcoming</Button>
+                  <Button variant={eventFilter==='Completed'?'default':'outline'} onClick={async()=>{ setEventFilter('Completed'); const evs = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/events?status=Completed`); if (evs) setTpoEvents(evs) }}>Completed</Button>
+                  <Button variant={eventFilter==='Cancelled'?'default':'outline'} onClick={async()=>{ setEventFilter('Cancelled'); const evs = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/events?status=Cancelled`); if (evs) setTpoEvents(evs) }}>Cancelled</Button>
+                  <Button variant={eventFilter==='All'?'default':'outline'} onClick={async()=>{ setEventFilter('All'); const evs = await fetchAllPages(`${API_BASE_DEFAULT}/api/v1/events`); if (evs) setTpoEvents(evs) }}>All</Button>
                 </div>
                 {isCreatingEvent && (
                   <Card className="border-none shadow-md mb-6">
@@ -0,0 +1,25 @@
+// List endpoints return at most `limit` rows per call (100 by default, 500 max)
+// and an X-Next-Cursor header while more remain.
+export const NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+export const MAX_PAGE_SIZE = 500
+
+function withParams(url: string, params: Record<string, string>) {
+  const query = Object.entries(params).map(([k, v]) => `${k}=${encodeURIComponent(v)}`).join('&')
+  return `${url}${url.includes('?') ? '&' : '?'}${query}`
+}
+
+// Follows X-Next-Cursor until the last page and returns every row, or null if
+// any page fails (callers keep what they already show in that case)
+export async function fetchAllPages<T = any>(url: string, init?: RequestInit): Promise<T[] | null> {
+  const rows: T[] = []
+  let cursor: string | null = null
+  do {
+    const params: Record<string, string> = { limit: String(MAX_PAGE_SIZE) }
+    if (cursor) params.cursor = cursor
+    const res = await fetch(withParams(url, params), init)
+    if (!res.ok) return null
+    rows.push(...(await res.json()))
+    cursor = res.headers.get(NEXT_CURSOR_HEADER)
+  } while (cursor)
+  return rows
+}